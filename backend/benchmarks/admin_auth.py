@@ -0,0 +1,45 @@
+"""Per-request cost of admin authentication, uncached versus cached.
+
+The uncached run clears the token and identity caches before every call, which
+is what each admin request used to pay: a JWT decode and a SELECT on admins.
+The cached run is the steady state of an admin panel session.
+"""
+import uuid
+
+from benchmarks.common import bench_engine, bench_session, report, reset_schema, summarize, time_call
+from db.models.admin import Admin
+from utils.auth import create_access_token, get_current_admin
+from utils.cache import caches
+
+REPEAT = 5000
+
+def clear_auth_caches():
+    caches["admin_tokens"].clear()
+    caches["admins"].clear()
+
+def main():
+    engine = bench_engine()
+    Session = bench_session(engine)
+    reset_schema(engine)
+
+    admin = Admin(id=uuid.uuid4(), username="bench", password="not-a-hash", email="bench@example.com")
+    with Session() as db:
+        db.add(admin)
+        db.commit()
+    token = create_access_token(admin)
+
+    results = []
+    with Session() as db:
+        def uncached():
+            clear_auth_caches()
+            get_current_admin(token, db)
+
+        results.append({"mode": "uncached", **summarize(time_call(uncached, repeat=REPEAT))})
+
+        clear_auth_caches()
+        results.append({"mode": "cached", **summarize(time_call(lambda: get_current_admin(token, db), repeat=REPEAT))})
+
+    report("admin_auth", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Requests per second and latency of the sync and async stacks under concurrency.
+
+Start the API twice against the same seeded database, once per mode, e.g.
+
+    DB_ASYNC=false uvicorn main:app --port 8001 --workers 1
+    DB_ASYNC=true  uvicorn main:app --port 8002 --workers 1
+
+then run `python -m benchmarks.async_stack`. BENCH_USER_ID, if set, adds
+GET /users/{id} to the mix next to GET /classes. Requires httpx.
+"""
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import report, summarize
+
+STACKS = {
+    "sync": os.getenv("BENCH_SYNC_URL", "http://127.0.0.1:8001"),
+    "async": os.getenv("BENCH_ASYNC_URL", "http://127.0.0.1:8002"),
+}
+CONCURRENCY = [50, 200, 1000]
+REQUESTS_PER_CLIENT = int(os.getenv("BENCH_REQUESTS_PER_CLIENT", "10"))
+
+def paths() -> list[str]:
+    user_id = os.getenv("BENCH_USER_ID")
+    return ["/classes", f"/users/{user_id}"] if user_id else ["/classes"]
+
+async def client_loop(client: httpx.AsyncClient, targets: list[str], latencies: list, errors: list):
+    for i in range(REQUESTS_PER_CLIENT):
+        started = time.perf_counter()
+        try:
+            response = await client.get(targets[i % len(targets)])
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+async def run(base_url: str, clients: int) -> dict:
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, paths(), latencies, errors) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "clients": clients,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "errors": len(errors),
+        **summarize(latencies),
+    }
+
+def main():
+    results = []
+    for stack, base_url in STACKS.items():
+        for clients in CONCURRENCY:
+            results.append({"stack": stack, **asyncio.run(run(base_url, clients))})
+
+    report("async_stack", results)
+
+if __name__ == "__main__":
+    main()
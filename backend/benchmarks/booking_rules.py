@@ -0,0 +1,132 @@
+"""Parallel double-tap stress test for the per-day and weekly booking rules.
+
+Every member holds a "συνδρομή *2" subscription (one booking per day, two per
+week) and fires several overlapping booking requests at once. The run is done
+twice: with the per-user lock and with the lock disabled, to show both that the
+invariants hold and what the serialization costs in throughput.
+"""
+import os
+import random
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest import mock
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from benchmarks.common import (
+    GREECE_TZ, bench_engine, bench_session, insert_rows, report, reset_schema,
+    seed_classes, seed_users, summarize
+)
+from db.models import Booking, Class, Subscription
+from db.models.subscription import SubscriptionModel
+from db.schemas.booking import BookingCreate
+from routes.bookings import create_booking
+from utils.member_tokens import MemberIdentity
+
+MEMBERS = int(os.getenv("BENCH_MEMBERS", "200"))
+ATTEMPTS_PER_MEMBER = int(os.getenv("BENCH_ATTEMPTS", "6"))
+WORKERS = int(os.getenv("BENCH_WORKERS", "32"))
+WEEKLY_LIMIT = 2
+
+def seed(engine):
+    reset_schema(engine)
+    now = datetime.now(GREECE_TZ)
+    next_monday = (now + timedelta(days=7 - now.weekday())).date()
+
+    with engine.begin() as conn:
+        user_ids = seed_users(conn, MEMBERS)
+        class_ids = seed_classes(conn, next_monday, 5, 4, max_participants=MEMBERS)
+        insert_rows(conn, Subscription, [
+            {
+                "user_id": user_id,
+                "subscription_model": SubscriptionModel.subscription_2,
+                "start_date": now - timedelta(days=1),
+                "end_date": now + timedelta(days=30),
+                "created_at": now,
+            }
+            for user_id in user_ids
+        ])
+    return user_ids, class_ids
+
+def violations(Session) -> dict:
+    with Session() as db:
+        per_day = db.execute(
+            select(Booking.user_id, Class.date, func.count(Booking.id))
+            .join(Class, Class.id == Booking.class_id)
+            .group_by(Booking.user_id, Class.date)
+            .having(func.count(Booking.id) > 1)
+        ).all()
+        per_week = db.execute(
+            select(Booking.user_id, func.count(Booking.id))
+            .group_by(Booking.user_id)
+            .having(func.count(Booking.id) > WEEKLY_LIMIT)
+        ).all()
+        duplicates = db.execute(
+            select(Booking.user_id, Booking.class_id)
+            .group_by(Booking.user_id, Booking.class_id)
+            .having(func.count(Booking.id) > 1)
+        ).all()
+        total = db.scalar(select(func.count(Booking.id)))
+
+    return {
+        "bookings": total,
+        "per_day_violations": len(per_day),
+        "weekly_violations": len(per_week),
+        "duplicate_bookings": len(duplicates),
+    }
+
+def run(engine, Session, locked: bool) -> dict:
+    user_ids, class_ids = seed(engine)
+    rng = random.Random(7)
+
+    # Overlapping attempts: repeated taps on the same class and several days of the same week.
+    attempts = [
+        (user_id, class_id)
+        for user_id in user_ids
+        for class_id in rng.sample(class_ids, ATTEMPTS_PER_MEMBER // 2) * 2
+    ]
+    rng.shuffle(attempts)
+
+    def book(attempt):
+        user_id, class_id = attempt
+        started = time.perf_counter()
+        with Session() as db:
+            try:
+                create_booking(booking_data=BookingCreate(class_id=class_id), db=db, current_user=MemberIdentity(id=user_id))
+            except HTTPException:
+                pass
+        return (time.perf_counter() - started) * 1000
+
+    if locked:
+        lock = nullcontext()
+    else:
+        lock = mock.patch("utils.bookings.lock_user_bookings", lambda db, user_id: None)
+
+    with lock:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            latencies = list(pool.map(book, attempts))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "per_user_lock": locked,
+        "requests": len(attempts),
+        "throughput_rps": round(len(attempts) / elapsed, 1),
+        **violations(Session),
+        **summarize(latencies),
+    }
+
+def main():
+    engine = bench_engine(pool_size=WORKERS, max_overflow=0)
+    Session = bench_session(engine)
+
+    report("booking_rules", [
+        run(engine, Session, locked=True),
+        run(engine, Session, locked=False),
+    ])
+
+if __name__ == "__main__":
+    main()
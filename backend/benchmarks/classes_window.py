@@ -0,0 +1,58 @@
+"""GET /classes latency as booking history grows from 1k to 1M rows.
+
+The public schedule only reads a fixed window of upcoming days, so its latency
+should stay flat no matter how many past classes and bookings exist.
+"""
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import (
+    GREECE_TZ, analyze, bench_engine, bench_session, report, reset_schema,
+    seed_bookings, seed_classes, seed_users, summarize, time_call
+)
+from utils.schedule import get_schedule_window
+
+HISTORY_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+CLASSES_PER_DAY = 20
+BOOKINGS_PER_CLASS = 8
+WINDOW_DAYS = 14
+REPEAT = 200
+
+def main():
+    rng = random.Random(42)
+    engine = bench_engine()
+    Session = bench_session(engine)
+    reset_schema(engine)
+
+    today = datetime.now(GREECE_TZ).date()
+    bookings_per_day = CLASSES_PER_DAY * BOOKINGS_PER_CLASS
+
+    with engine.begin() as conn:
+        user_ids = seed_users(conn, 500)
+        upcoming = seed_classes(conn, today, WINDOW_DAYS, CLASSES_PER_DAY)
+        seed_bookings(conn, upcoming, user_ids, BOOKINGS_PER_CLASS // 2, rng)
+
+    history_days = 0
+    results = []
+    for size in HISTORY_SIZES:
+        days_needed = -(-size // bookings_per_day) - history_days
+        if days_needed > 0:
+            first_day = today - timedelta(days=history_days + days_needed)
+            with engine.begin() as conn:
+                past = seed_classes(conn, first_day, days_needed, CLASSES_PER_DAY)
+                seed_bookings(conn, past, user_ids, BOOKINGS_PER_CLASS, rng)
+            history_days += days_needed
+        analyze(engine)
+
+        with Session() as db:
+            samples = time_call(
+                lambda: get_schedule_window(db, today, today + timedelta(days=WINDOW_DAYS - 1)),
+                repeat=REPEAT
+            )
+
+        results.append({"history_bookings": history_days * bookings_per_day, **summarize(samples)})
+
+    report("classes_window", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks always run against the scratch database in BENCH_DB_URL and drop
+and recreate its tables, so never point BENCH_DB_URL at a real database.
+Run them from the backend directory, e.g. `python -m benchmarks.classes_window`.
+"""
+import json
+import math
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import create_engine, insert, text, update
+from sqlalchemy.orm import sessionmaker
+
+from db.database import Base
+from db.models import Booking, Class, User
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+CLASS_TIMES = [dt_time(h, m) for h in range(8, 22) for m in (0, 30)]
+CLASS_NAMES = ["Pilates Reformer", "Pilates Mat", "Cadillac Flow", "Yoga"]
+
+def bench_engine(**kwargs):
+    url = os.getenv("BENCH_DB_URL")
+    if not url:
+        raise SystemExit("BENCH_DB_URL is not set. Point it at a scratch Postgres database.")
+    return create_engine(url, **kwargs)
+
+def bench_session(engine):
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+def reset_schema(engine):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def insert_rows(conn, model, rows: list, chunk: int = 10_000):
+    for i in range(0, len(rows), chunk):
+        conn.execute(insert(model), rows[i:i + chunk])
+
+def seed_users(conn, count: int, offset: int = 0) -> list:
+    now = datetime.now(GREECE_TZ)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "phone": f"69{offset + i:08d}",
+            "password": offset + i + 1,
+            "name": f"Member {offset + i}",
+            "created_at": now,
+            "has_accepted_terms": True,
+        }
+        for i in range(count)
+    ]
+    insert_rows(conn, User, rows)
+    return [r["id"] for r in rows]
+
+def seed_classes(conn, start_date: date, days: int, per_day: int, max_participants: int = 10) -> list:
+    rows = []
+    for d in range(days):
+        day = start_date + timedelta(days=d)
+        for slot in range(per_day):
+            rows.append({
+                "id": uuid.uuid4(),
+                "class_name": CLASS_NAMES[slot % len(CLASS_NAMES)],
+                "date": day,
+                "time": CLASS_TIMES[slot % len(CLASS_TIMES)],
+                "current_participants": 0,
+                "max_participants": max_participants,
+            })
+    insert_rows(conn, Class, rows)
+    return [r["id"] for r in rows]
+
+def seed_bookings(conn, class_ids: list, user_ids: list, per_class: int, rng: random.Random, chunk: int = 10_000) -> int:
+    """Books per_class random members into each class and counts them in current_participants."""
+    now = datetime.now(GREECE_TZ)
+    rows = []
+    for class_id in class_ids:
+        for user_id in rng.sample(user_ids, per_class):
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "class_id": class_id,
+                "status": "confirmed",
+                "created_at": now,
+            })
+    insert_rows(conn, Booking, rows)
+    for i in range(0, len(class_ids), chunk):
+        conn.execute(
+            update(Class)
+            .where(Class.id.in_(class_ids[i:i + chunk]))
+            .values(current_participants=Class.current_participants + per_class)
+        )
+    return len(rows)
+
+def analyze(engine):
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+def summarize(samples_ms: list) -> dict:
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 3) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "max_ms": round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+def time_call(fn, repeat: int, warmup: int = 3) -> list:
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def report(name: str, results):
+    """Prints one JSON document per benchmark, and appends it to BENCH_OUTPUT if set."""
+    line = json.dumps({"benchmark": name, "results": results}, default=str)
+    print(line)
+
+    output = os.getenv("BENCH_OUTPUT")
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
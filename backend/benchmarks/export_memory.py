@@ -0,0 +1,78 @@
+"""Resident memory of the streaming bookings export at 10k, 100k and 1M rows.
+
+The export reads through a server-side cursor and encodes one batch at a time,
+so the RSS growth while streaming should stay flat as the row count grows by
+two orders of magnitude. Reads /proc/self/statm, so it runs on Linux only.
+"""
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import (
+    analyze, bench_engine, bench_session, report, reset_schema, seed_bookings, seed_classes, seed_users
+)
+from utils.export import bookings_export_query, stream_export
+
+EXPORT_SIZES = [10_000, 100_000, 1_000_000]
+CLASSES_PER_DAY = 20
+BOOKINGS_PER_CLASS = 10
+SEED_DAYS_PER_BATCH = 100
+FIRST_DAY = date(2020, 1, 1)
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+def seed(engine, rng: random.Random, days: int):
+    with engine.begin() as conn:
+        user_ids = seed_users(conn, 10_000)
+
+    for offset in range(0, days, SEED_DAYS_PER_BATCH):
+        batch_days = min(SEED_DAYS_PER_BATCH, days - offset)
+        with engine.begin() as conn:
+            class_ids = seed_classes(conn, FIRST_DAY + timedelta(days=offset), batch_days, CLASSES_PER_DAY)
+            seed_bookings(conn, class_ids, user_ids, BOOKINGS_PER_CLASS, rng)
+
+def export(Session, end_date: date, fmt: str) -> dict:
+    baseline = peak = rss_mb()
+    total_bytes = 0
+    first_byte_ms = None
+
+    started = time.perf_counter()
+    for chunk in stream_export(bookings_export_query(FIRST_DAY, end_date), fmt, session_factory=Session):
+        if first_byte_ms is None:
+            first_byte_ms = (time.perf_counter() - started) * 1000
+        total_bytes += len(chunk)
+        peak = max(peak, rss_mb())
+    elapsed = time.perf_counter() - started
+
+    return {
+        "format": fmt,
+        "seconds": round(elapsed, 2),
+        "first_byte_ms": round(first_byte_ms or 0, 1),
+        "bytes": total_bytes,
+        "rss_growth_mb": round(peak - baseline, 1),
+    }
+
+def main():
+    engine = bench_engine()
+    Session = bench_session(engine)
+    reset_schema(engine)
+
+    bookings_per_day = CLASSES_PER_DAY * BOOKINGS_PER_CLASS
+    seed(engine, random.Random(42), EXPORT_SIZES[-1] // bookings_per_day)
+    analyze(engine)
+
+    results = []
+    for size in EXPORT_SIZES:
+        end_date = FIRST_DAY + timedelta(days=size // bookings_per_day - 1)
+        for fmt in ("csv", "ndjson"):
+            result = export(Session, end_date, fmt)
+            results.append({"rows": size, **result, "rows_per_sec": round(size / result["seconds"])})
+
+    report("export_memory", results)
+
+if __name__ == "__main__":
+    main()
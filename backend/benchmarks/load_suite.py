@@ -0,0 +1,278 @@
+"""End-to-end load suite: the app under the studio's busiest moments.
+
+Seeds the scratch database in BENCH_DB_URL, starts the API on it with uvicorn
+(one worker, BENCH_PORT) and runs the named scenarios over HTTP:
+
+    new_week_opens       members rush POST /bookings on a few popular classes
+    dashboard_refresh    GET /users/{id}, POST /subscription and
+                         POST /users/{id}/remaining_classes per member
+    admin_day_view       GET /admin/classes?date= across the schedule
+    schedule_generation  POST /admin/generate_schedule week after week
+
+Each scenario reports throughput, p50/p95/p99 latency, the error rate (any
+status the scenario does not expect, and transport failures) and the count of
+every status code, tagged with the current commit so runs can be compared.
+Set BENCH_SCENARIOS to a comma separated subset to run only those. Requires
+httpx.
+
+    python -m benchmarks.load_suite
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, time as dt_time, timedelta
+
+import httpx
+
+from benchmarks.common import (
+    GREECE_TZ, analyze, bench_engine, insert_rows, report, reset_schema,
+    seed_bookings, seed_classes, seed_users, summarize
+)
+from db.models import Admin, Subscription, TemplateClass, User
+from db.models.subscription import SubscriptionModel
+from utils.auth import create_access_token
+from utils.member_tokens import create_member_token
+
+PORT = int(os.getenv("BENCH_PORT", "8010"))
+BASE_URL = f"http://127.0.0.1:{PORT}"
+MEMBERS = int(os.getenv("BENCH_MEMBERS", "2000"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+DURATION = float(os.getenv("BENCH_DURATION", "10"))
+
+CLASSES_PER_DAY = 20
+HISTORY_DAYS = 28
+BOOKINGS_PER_CLASS = 5
+POPULAR_CLASSES = 3
+RUSH_MEMBERS = 300
+GENERATED_WEEKS = 8
+
+WEEKLY_MODELS = [SubscriptionModel.subscription_2, SubscriptionModel.subscription_3, SubscriptionModel.subscription_5]
+
+def seed(engine) -> dict:
+    rng = random.Random(42)
+    now = datetime.now(GREECE_TZ)
+    today = now.date()
+
+    # The week that opens is the Monday to Sunday week after next. Weekly
+    # quotas count per calendar week, so the bookings seeded on the days
+    # before it never use up a rushing member's quota for it.
+    opening = today + timedelta(days=14 - today.weekday())
+    schedule_end = opening + timedelta(days=6)
+    booked_days = (opening - today).days - 1
+
+    reset_schema(engine)
+    with engine.begin() as conn:
+        user_ids = seed_users(conn, MEMBERS)
+        seed_classes(conn, today - timedelta(days=HISTORY_DAYS), HISTORY_DAYS, CLASSES_PER_DAY)
+        upcoming = seed_classes(conn, today + timedelta(days=1), (schedule_end - today).days, CLASSES_PER_DAY)
+        seed_bookings(conn, upcoming[:booked_days * CLASSES_PER_DAY], user_ids, BOOKINGS_PER_CLASS, rng)
+
+        insert_rows(conn, Subscription, [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "subscription_model": rng.choice(WEEKLY_MODELS),
+                "start_date": now - timedelta(days=HISTORY_DAYS),
+                "end_date": datetime.combine(schedule_end, dt_time.max, tzinfo=GREECE_TZ) + timedelta(days=30),
+                "created_at": now,
+            }
+            for user_id in user_ids
+        ])
+        insert_rows(conn, TemplateClass, [
+            {"id": uuid.uuid4(), "class_name": f"Template {weekday}-{slot}", "weekday": weekday,
+             "time": dt_time(8 + slot), "max_participants": 10, "is_active": True}
+            for weekday in range(6) for slot in range(12)
+        ])
+
+        admin_id = uuid.uuid4()
+        insert_rows(conn, Admin, [{"id": admin_id, "username": "bench", "password": "-", "email": "bench@example.com"}])
+    analyze(engine)
+
+    admin = Admin(id=admin_id, username="bench")
+    return {
+        "today": today,
+        "schedule_end": schedule_end,
+        "members": user_ids,
+        "member_tokens": {user_id: create_member_token(User(id=user_id)) for user_id in user_ids},
+        "admin_token": create_access_token(admin),
+        "opening_week": upcoming[booked_days * CLASSES_PER_DAY:],
+    }
+
+def start_server(database_url: str) -> subprocess.Popen:
+    # One process, pointed at the scratch database whatever .env says.
+    bootstrap = (
+        "import sys, uvicorn\n"
+        "from db import database\n"
+        "database.DATABASE_URL = sys.argv[1]\n"
+        "from main import app\n"
+        f"uvicorn.run(app, host='127.0.0.1', port={PORT}, log_level='warning')\n"
+    )
+    server = subprocess.Popen([sys.executable, "-c", bootstrap, database_url])
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{BASE_URL}/readyz", timeout=2).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            sys.exit("The API exited during startup.")
+        time.sleep(0.2)
+
+    server.terminate()
+    sys.exit("The API did not become ready within 60 s.")
+
+class Recorder:
+    def __init__(self, expected: tuple = (200,)):
+        # Anything else counts as an error, so a run of 401s or 422s is not a clean run.
+        self.expected = expected
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    async def send(self, client: httpx.AsyncClient, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            self.statuses[response.status_code] += 1
+            if response.status_code not in self.expected:
+                self.errors += 1
+            return response
+        except httpx.HTTPError as e:
+            self.statuses[type(e).__name__] += 1
+            self.errors += 1
+        finally:
+            self.latencies.append((time.perf_counter() - started) * 1000)
+
+    def result(self, scenario: str, elapsed: float, **extra) -> dict:
+        total = len(self.latencies)
+        return {
+            "scenario": scenario,
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=lambda kv: str(kv[0]))},
+            **summarize(self.latencies),
+            **extra,
+        }
+
+async def run_for(duration: float, clients: int, step):
+    """Runs step(client_index) in a loop on `clients` tasks until duration has passed."""
+    deadline = time.perf_counter() + duration
+
+    async def loop(i: int):
+        while time.perf_counter() < deadline:
+            await step(i)
+
+    await asyncio.gather(*(loop(i) for i in range(clients)))
+
+async def new_week_opens(client: httpx.AsyncClient, data: dict) -> dict:
+    """Every rushing member tries to book one of the few popular classes at once."""
+    rng = random.Random(1)
+    popular = rng.sample(data["opening_week"], POPULAR_CLASSES)
+    rushing = rng.sample(data["members"], min(RUSH_MEMBERS, len(data["members"])))
+    # 201 booked, 409 class full; both are expected outcomes of a rush.
+    recorder = Recorder(expected=(201, 409))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        recorder.send(
+            client, "POST", "/bookings",
+            json={"class_id": str(popular[i % POPULAR_CLASSES])},
+            headers={"Authorization": f"Bearer {data['member_tokens'][member_id]}"}
+        )
+        for i, member_id in enumerate(rushing)
+    ))
+    return recorder.result("new_week_opens", time.perf_counter() - started, classes=POPULAR_CLASSES)
+
+async def dashboard_refresh(client: httpx.AsyncClient, data: dict) -> dict:
+    rng = random.Random(2)
+    members = data["members"]
+    recorder = Recorder()
+
+    async def step(i: int):
+        user_id = rng.choice(members)
+        await recorder.send(client, "GET", f"/users/{user_id}")
+        await recorder.send(client, "POST", "/subscription", params={"user_id": str(user_id)})
+        await recorder.send(client, "POST", f"/users/{user_id}/remaining_classes")
+
+    started = time.perf_counter()
+    await run_for(DURATION, CONCURRENCY, step)
+    return recorder.result("dashboard_refresh", time.perf_counter() - started, clients=CONCURRENCY)
+
+async def admin_day_view(client: httpx.AsyncClient, data: dict) -> dict:
+    rng = random.Random(3)
+    today = data["today"]
+    headers = {"Authorization": f"Bearer {data['admin_token']}"}
+    recorder = Recorder()
+
+    async def step(i: int):
+        day = today + timedelta(days=rng.randint(-HISTORY_DAYS, (data["schedule_end"] - today).days))
+        await recorder.send(client, "GET", "/admin/classes", params={"date": str(day)}, headers=headers)
+
+    started = time.perf_counter()
+    # A handful of admins, not a crowd.
+    await run_for(DURATION, min(CONCURRENCY, 5), step)
+    return recorder.result("admin_day_view", time.perf_counter() - started, clients=min(CONCURRENCY, 5))
+
+async def schedule_generation(client: httpx.AsyncClient, data: dict) -> dict:
+    """Fills GENERATED_WEEKS new weeks, then regenerates them (all slots skipped)."""
+    first = data["schedule_end"] + timedelta(days=1)
+    headers = {"Authorization": f"Bearer {data['admin_token']}"}
+    recorder = Recorder()
+    created = skipped = 0
+
+    started = time.perf_counter()
+    for _ in range(2):
+        for week in range(GENERATED_WEEKS):
+            start = first + timedelta(weeks=week)
+            response = await recorder.send(client, "POST", "/admin/generate_schedule", headers=headers, params={
+                "start_date": str(start), "end_date": str(start + timedelta(days=6))
+            })
+            if response is not None and response.status_code == 200:
+                created += response.json()["created"]
+                skipped += response.json()["skipped"]
+    return recorder.result("schedule_generation", time.perf_counter() - started, created=created, skipped=skipped)
+
+SCENARIOS = {
+    "new_week_opens": new_week_opens,
+    "dashboard_refresh": dashboard_refresh,
+    "admin_day_view": admin_day_view,
+    "schedule_generation": schedule_generation,
+}
+
+async def run_scenarios(data: dict, names: list[str]) -> list:
+    limits = httpx.Limits(max_connections=max(CONCURRENCY, RUSH_MEMBERS), max_keepalive_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        return [await SCENARIOS[name](client, data) for name in names]
+
+def current_commit() -> str | None:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+def main():
+    names = [n.strip() for n in os.getenv("BENCH_SCENARIOS", ",".join(SCENARIOS)).split(",") if n.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    engine = bench_engine()
+    data = seed(engine)
+    server = start_server(engine.url.render_as_string(hide_password=False))
+    try:
+        results = asyncio.run(run_scenarios(data, names))
+    finally:
+        server.terminate()
+        server.wait()
+
+    commit = current_commit()
+    report("load_suite", [{"commit": commit, "members": MEMBERS, **r} for r in results])
+
+if __name__ == "__main__":
+    main()
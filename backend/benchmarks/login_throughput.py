@@ -0,0 +1,67 @@
+"""Admin logins per second and their effect on concurrent GET /classes latency.
+
+Start the API against a database that has an admin account, e.g.
+
+    uvicorn main:app --port 8001 --workers 1
+
+then run `python -m benchmarks.login_throughput` with BENCH_ADMIN_USERNAME and
+BENCH_ADMIN_PASSWORD set. /classes is measured alone first and then next to
+bursts of logins; with hashing on its own pool the two should stay close.
+Requires httpx.
+"""
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import report, summarize
+
+BASE_URL = os.getenv("BENCH_URL", "http://127.0.0.1:8001")
+LOGIN_CONCURRENCY = [0, 8, 32, 128]
+CLASSES_CLIENTS = 20
+DURATION = float(os.getenv("BENCH_DURATION", "10"))
+
+async def hammer(client: httpx.AsyncClient, request, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await request(client)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+async def run(logins: int) -> dict:
+    credentials = {
+        "username": os.environ["BENCH_ADMIN_USERNAME"],
+        "password": os.environ["BENCH_ADMIN_PASSWORD"],
+    }
+    login_latencies, login_errors = [], []
+    classes_latencies, classes_errors = [], []
+
+    limits = httpx.Limits(max_connections=logins + CLASSES_CLIENTS)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + DURATION
+        await asyncio.gather(
+            *(hammer(client, lambda c: c.post("/admin/login", json=credentials), deadline, login_latencies, login_errors)
+              for _ in range(logins)),
+            *(hammer(client, lambda c: c.get("/classes"), deadline, classes_latencies, classes_errors)
+              for _ in range(CLASSES_CLIENTS)),
+        )
+
+    return {
+        "login_clients": logins,
+        "logins_per_sec": round(len(login_latencies) / DURATION, 1),
+        "login_errors": len(login_errors),
+        "login_p95_ms": summarize(login_latencies)["p95_ms"],
+        "classes_errors": len(classes_errors),
+        "classes": summarize(classes_latencies),
+    }
+
+def main():
+    report("login_throughput", [asyncio.run(run(logins)) for logins in LOGIN_CONCURRENCY])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Throughput of the bulk member import against the old row-at-a-time import.
+
+Writes a CSV of each size where 5% of the phones are already registered and
+1% of the rows are invalid, then imports it with scripts.populate_db at a few
+batch sizes (and once as a dry run). The baseline does what the import used
+to: one SELECT per row for the phone, one ORM add per member and
+subscription, and one commit at the end; it only runs at the smallest size.
+"""
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import GREECE_TZ, bench_engine, bench_session, report, reset_schema, seed_users
+from db.models import Subscription, User
+from db.models.subscription import SubscriptionModel
+from scripts.populate_db import import_members
+
+IMPORT_SIZES = [10_000, 100_000]
+BATCH_SIZES = [500, 5000]
+BASELINE_SIZE = 10_000
+REGISTERED_SHARE = 0.05
+INVALID_SHARE = 0.01
+
+COLUMNS = [
+    "name", "phone", "password", "role", "city", "subscription_model",
+    "subscription_starts", "subscription_expires", "package_total", "remaining_classes"
+]
+
+def write_csv(path: str, size: int, rng: random.Random):
+    today = date.today()
+    models = list(SubscriptionModel)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(size):
+            model = rng.choice(models)
+            starts = today - timedelta(days=rng.randrange(60))
+            total = rng.choice([5, 10, 15, 20]) if "package" in model.name else None
+            writer.writerow([
+                f"Imported {i}", f"69{i:08d}", "", "client", rng.choice(["Αθήνα", "Πειραιάς", ""]),
+                model.name, starts.isoformat(),
+                "not-a-date" if rng.random() < INVALID_SHARE else (starts + timedelta(days=60)).isoformat(),
+                total or "", total or "",
+            ])
+
+def prepare(engine, size: int):
+    reset_schema(engine)
+    with engine.begin() as conn:
+        seed_users(conn, int(size * REGISTERED_SHARE))
+
+def row_at_a_time(engine, path: str) -> dict:
+    """The previous import, updated for subscriptions living on their own table."""
+    Session = bench_session(engine)
+    started = time.perf_counter()
+    added = 0
+    with Session() as db, open(path, encoding="utf-8") as f:
+        password = db.query(User.password).order_by(User.password.desc()).limit(1).scalar() or 0
+        for row in csv.DictReader(f):
+            if db.query(User).filter(User.phone == row["phone"]).first():
+                continue
+            try:
+                starts = datetime.fromisoformat(row["subscription_starts"]).replace(tzinfo=GREECE_TZ)
+                expires = datetime.fromisoformat(row["subscription_expires"]).replace(tzinfo=GREECE_TZ)
+            except ValueError:
+                continue
+            password += 1
+            user = User(name=row["name"], phone=row["phone"], password=password, city=row["city"] or None,
+                        created_at=datetime.now(GREECE_TZ))
+            db.add(user)
+            db.flush()
+            db.add(Subscription(
+                user_id=user.id, subscription_model=SubscriptionModel[row["subscription_model"]],
+                start_date=starts, end_date=expires,
+                package_total=int(row["package_total"]) if row["package_total"] else None,
+                remaining_classes=int(row["remaining_classes"]) if row["remaining_classes"] else None,
+            ))
+            added += 1
+        db.commit()
+    elapsed = time.perf_counter() - started
+    return {"imported": added, "seconds": round(elapsed, 3), "rows_per_second": round(BASELINE_SIZE / elapsed, 1)}
+
+def main():
+    engine = bench_engine()
+    rng = random.Random(42)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in IMPORT_SIZES:
+            path = os.path.join(tmp, f"members_{size}.csv")
+            write_csv(path, size, rng)
+
+            runs = [("dry_run", BATCH_SIZES[-1], True)] + [(f"batch_{b}", b, False) for b in BATCH_SIZES]
+            for label, batch_size, dry_run in runs:
+                prepare(engine, size)
+                result = import_members(engine, path, batch_size=batch_size, dry_run=dry_run,
+                                        errors_path=os.path.join(tmp, "errors.csv"))
+                results.append({
+                    "size": size, "run": label, "imported": result.imported, "skipped": result.skipped,
+                    "errors": result.errors, "seconds": round(result.seconds, 3),
+                    "rows_per_second": result.rows_per_second,
+                })
+
+            if size == BASELINE_SIZE:
+                prepare(engine, size)
+                results.append({"size": size, "run": "row_at_a_time", **row_at_a_time(engine, path)})
+
+    report("member_import", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Throughput, latency and checkout wait for different pool sizes under load.
+
+CONCURRENCY threads read the 14-day schedule window in a loop through one
+engine per configuration. Too small a pool shows up as checkout wait and
+timeouts; past the point where Postgres is saturated, a bigger pool only adds
+connections.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import exc
+
+from benchmarks.common import (
+    GREECE_TZ, analyze, bench_engine, bench_session, report, reset_schema,
+    seed_bookings, seed_classes, seed_users, summarize
+)
+from db.pool import InstrumentedQueuePool
+from utils.schedule import get_schedule_window
+
+# (pool_size, max_overflow)
+POOL_CONFIGS = [(2, 0), (5, 0), (10, 0), (10, 20), (30, 0), (64, 0)]
+CONCURRENCY = 64
+DURATION_SECONDS = 10
+POOL_TIMEOUT = 5
+WINDOW_DAYS = 14
+
+class RecordingPool(InstrumentedQueuePool):
+    """Keeps this run's checkout waits besides feeding the shared histogram."""
+    metrics_label = "bench"
+    waits: list = []
+    timeouts: list = []
+
+    def observe_checkout(self, wait: float, timed_out: bool):
+        super().observe_checkout(wait, timed_out)
+        (self.timeouts if timed_out else self.waits).append(wait * 1000)
+
+def run(pool_size: int, max_overflow: int, today) -> dict:
+    RecordingPool.waits, RecordingPool.timeouts = [], []
+    engine = bench_engine(
+        poolclass=RecordingPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=POOL_TIMEOUT
+    )
+    Session = bench_session(engine)
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + DURATION_SECONDS
+
+    def worker():
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                with Session() as db:
+                    get_schedule_window(db, today, today + timedelta(days=WINDOW_DAYS - 1))
+            except exc.TimeoutError:
+                failed += 1
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker) for _ in range(CONCURRENCY)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    wait = summarize(RecordingPool.waits)
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "concurrency": CONCURRENCY,
+        "throughput_rps": round(len(latencies) / DURATION_SECONDS, 1),
+        "timeouts": sum(errors),
+        **summarize(latencies),
+        "checkout_wait_p50_ms": wait["p50_ms"],
+        "checkout_wait_p99_ms": wait["p99_ms"],
+    }
+
+def main():
+    rng = random.Random(42)
+    engine = bench_engine()
+    reset_schema(engine)
+
+    today = datetime.now(GREECE_TZ).date()
+    with engine.begin() as conn:
+        user_ids = seed_users(conn, 500)
+        class_ids = seed_classes(conn, today, WINDOW_DAYS, 20)
+        seed_bookings(conn, class_ids, user_ids, 6, rng)
+    analyze(engine)
+    engine.dispose()
+
+    report("pool_size", [run(size, overflow, today) for size, overflow in POOL_CONFIGS])
+
+if __name__ == "__main__":
+    main()
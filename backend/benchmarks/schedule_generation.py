@@ -0,0 +1,75 @@
+"""POST /admin/generate_schedule cost for 7, 90 and 365 day ranges.
+
+Each range is generated into an empty classes table and then generated again,
+when every class already exists and is skipped. Both runs are a single
+INSERT ... SELECT, so the time should grow with the rows written, not with
+one round trip per template and day.
+"""
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+
+from benchmarks.common import (
+    CLASS_NAMES, CLASS_TIMES, GREECE_TZ, bench_engine, bench_session, insert_rows, report, reset_schema
+)
+from db.models import Class
+from db.models.template_class import TemplateClass
+from utils.schedule import generate_classes
+
+RANGES = [7, 90, 365]
+TEMPLATES_PER_WEEKDAY = 12
+
+def seed_templates(conn):
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "class_name": CLASS_NAMES[slot % len(CLASS_NAMES)],
+            "weekday": weekday,
+            "time": CLASS_TIMES[slot],
+            "max_participants": 10,
+            "is_active": True,
+        }
+        for weekday in range(7)
+        for slot in range(TEMPLATES_PER_WEEKDAY)
+    ]
+    insert_rows(conn, TemplateClass, rows)
+
+def timed_generate(Session, start_date, end_date) -> tuple[float, int, int]:
+    with Session() as db:
+        started = time.perf_counter()
+        created, skipped = generate_classes(db, start_date, end_date)
+        db.commit()
+        return (time.perf_counter() - started) * 1000, created, skipped
+
+def main():
+    engine = bench_engine()
+    Session = bench_session(engine)
+    reset_schema(engine)
+
+    with engine.begin() as conn:
+        seed_templates(conn)
+
+    start_date = datetime.now(GREECE_TZ).date()
+    results = []
+    for days in RANGES:
+        with engine.begin() as conn:
+            conn.execute(delete(Class))
+        end_date = start_date + timedelta(days=days - 1)
+
+        fresh_ms, created, _ = timed_generate(Session, start_date, end_date)
+        rerun_ms, _, skipped = timed_generate(Session, start_date, end_date)
+
+        results.append({
+            "days": days,
+            "created": created,
+            "fresh_ms": round(fresh_ms, 1),
+            "skipped": skipped,
+            "rerun_ms": round(rerun_ms, 1),
+        })
+
+    report("schedule_generation", results)
+
+if __name__ == "__main__":
+    main()
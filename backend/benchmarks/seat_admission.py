@@ -0,0 +1,85 @@
+"""Burst of parallel POST /bookings against one popular class.
+
+Every member holds a valid subscription, so the only thing standing between
+the burst and an overbooked class is seat admission. Reports throughput, the
+latency distribution and whether the class ended up over capacity.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from benchmarks.common import (
+    GREECE_TZ, bench_engine, bench_session, insert_rows, report, reset_schema,
+    seed_classes, seed_users, summarize
+)
+from db.models import Booking, Class, Subscription
+from db.models.subscription import SubscriptionModel
+from db.schemas.booking import BookingCreate
+from routes.bookings import create_booking
+from utils.member_tokens import MemberIdentity
+
+MEMBERS = int(os.getenv("BENCH_MEMBERS", "500"))
+CAPACITY = int(os.getenv("BENCH_CAPACITY", "12"))
+WORKERS = int(os.getenv("BENCH_WORKERS", "64"))
+
+def main():
+    engine = bench_engine(pool_size=WORKERS, max_overflow=0)
+    Session = bench_session(engine)
+    reset_schema(engine)
+
+    now = datetime.now(GREECE_TZ)
+    with engine.begin() as conn:
+        user_ids = seed_users(conn, MEMBERS)
+        class_id = seed_classes(conn, (now + timedelta(days=2)).date(), 1, 1, max_participants=CAPACITY)[0]
+        insert_rows(conn, Subscription, [
+            {
+                "user_id": user_id,
+                "subscription_model": SubscriptionModel.free,
+                "start_date": now - timedelta(days=1),
+                "end_date": now + timedelta(days=30),
+                "created_at": now,
+            }
+            for user_id in user_ids
+        ])
+
+    def book(user_id):
+        started = time.perf_counter()
+        with Session() as db:
+            try:
+                create_booking(booking_data=BookingCreate(class_id=class_id), db=db, current_user=MemberIdentity(id=user_id))
+                outcome = "booked"
+            except HTTPException as e:
+                outcome = "full" if e.status_code == 409 else f"rejected_{e.status_code}"
+        return outcome, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(book, user_ids))
+    elapsed = time.perf_counter() - started
+
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    with Session() as db:
+        booked = db.scalar(select(func.count(Booking.id)).where(Booking.class_id == class_id))
+        counter = db.scalar(select(Class.current_participants).where(Class.id == class_id))
+
+    report("seat_admission", {
+        "requests": len(results),
+        "workers": WORKERS,
+        "capacity": CAPACITY,
+        "throughput_rps": round(len(results) / elapsed, 1),
+        "outcomes": outcomes,
+        "bookings": booked,
+        "counter": counter,
+        "overbooked": booked > CAPACITY or counter != booked,
+        **summarize([latency for _, latency in results]),
+    })
+
+if __name__ == "__main__":
+    main()
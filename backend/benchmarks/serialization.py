@@ -0,0 +1,87 @@
+"""Serialization time and bytes on the wire for a 5k-class schedule.
+
+Compares FastAPI's default path (validate, jsonable_encoder, stdlib JSON)
+with the fast path in utils.serialization: TypeAdapter straight to bytes,
+the orjson response class, MessagePack, and gzip/brotli on top. Needs no
+database; the classes are transient ORM objects.
+"""
+import gzip
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.common import CLASS_NAMES, CLASS_TIMES, GREECE_TZ, report, summarize, time_call
+from db.models import Class, User
+from db.schemas.class_ import ClassOut
+from utils import serialization
+from utils.serialization import BROTLI_QUALITY, GZIP_LEVEL, dump_json, type_adapter
+
+CLASS_COUNT = 5_000
+PARTICIPANTS_PER_CLASS = 6
+REPEAT = 20
+
+def build_classes(rng: random.Random) -> list:
+    today = datetime.now(GREECE_TZ).date()
+    now = datetime.now(GREECE_TZ)
+    members = [
+        User(id=uuid.uuid4(), name=f"Member {i}", city="Athens", password=i + 1, phone=f"69{i:08d}", created_at=now)
+        for i in range(500)
+    ]
+
+    classes = []
+    for i in range(CLASS_COUNT):
+        class_obj = Class(
+            id=uuid.uuid4(),
+            class_name=CLASS_NAMES[i % len(CLASS_NAMES)],
+            date=today + timedelta(days=i // len(CLASS_TIMES)),
+            time=CLASS_TIMES[i % len(CLASS_TIMES)],
+            current_participants=PARTICIPANTS_PER_CLASS,
+            max_participants=10
+        )
+        class_obj.users = rng.sample(members, PARTICIPANTS_PER_CLASS)
+        classes.append(class_obj)
+    return classes
+
+def main():
+    classes = build_classes(random.Random(42))
+    adapter = type_adapter(List[ClassOut])
+
+    def default_path():
+        return JSONResponse(jsonable_encoder([ClassOut.model_validate(c) for c in classes])).body
+
+    def orjson_response():
+        return serialization.DefaultResponse(
+            adapter.dump_python(adapter.validate_python(classes, from_attributes=True), mode="json")
+        ).body
+
+    def fast_json():
+        return dump_json(List[ClassOut], classes)
+
+    encoders = {
+        "default_jsonable_encoder": default_path,
+        "orjson_response": orjson_response,
+        "type_adapter_json": fast_json,
+        "type_adapter_json_gzip": lambda: gzip.compress(fast_json(), compresslevel=GZIP_LEVEL),
+    }
+    if serialization.msgpack:
+        encoders["msgpack"] = lambda: serialization.encode_body(fast_json(), True, None)[0]
+    if serialization.brotli:
+        encoders["type_adapter_json_brotli"] = lambda: serialization.brotli.compress(fast_json(), quality=BROTLI_QUALITY)
+        if serialization.msgpack:
+            encoders["msgpack_brotli"] = lambda: serialization.brotli.compress(
+                serialization.encode_body(fast_json(), True, None)[0], quality=BROTLI_QUALITY
+            )
+
+    results = []
+    for name, encode in encoders.items():
+        samples = time_call(encode, repeat=REPEAT)
+        results.append({"encoder": name, "classes": CLASS_COUNT, "bytes": len(encode()), **summarize(samples)})
+
+    report("serialization", results)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
+from functools import lru_cache
+from uuid import uuid4
 from sqlalchemy import NullPool, QueuePool, create_engine
-from sqlalchemy.pool import NullPool
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
 import os
@@ -10,27 +11,122 @@ Base = declarative_base()
 load_dotenv(override=True)
 
 DATABASE_URL = os.getenv("DB_URL")
-if not DATABASE_URL:
-    raise ValueError("DB_URL not found in .env")
-
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=30,
-    pool_recycle=1800
-)
 
-try:
-    with engine.connect() as connection:
-        print("Connection successful!")
-except Exception as e:
-    print(f"Failed to connect: {e}")
+# DB_ASYNC=true serves the hot routes from async handlers on an asyncpg engine.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+# Pool sizes are per engine and per worker: with W workers (and DB_ASYNC) the
+# API may hold up to W * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections per engine.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+
+# DB_PGBOUNCER=true when DB_URL points at PgBouncer in transaction mode: it
+# does the pooling, so the engines keep no connections of their own, and
+# asyncpg must not rely on prepared statements, which do not survive a
+# server connection switch.
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+# Nothing here connects or even creates an engine at import time: the engines
+# are built on first use, and `engine`, `async_engine` and `AsyncSessionLocal`
+# resolve through the module __getattr__ below. Importing the models (Alembic,
+# scripts, tooling) never touches the database.
+
+def _database_url() -> str:
+    if not DATABASE_URL:
+        raise ValueError("DB_URL not found in .env")
+    return DATABASE_URL
+
+def _pool_options(poolclass) -> dict:
+    if DB_PGBOUNCER:
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+@lru_cache(maxsize=None)
+def get_engine():
+    from db.pool import InstrumentedQueuePool
+
+    return create_engine(_database_url(), **_pool_options(InstrumentedQueuePool))
+
+@lru_cache(maxsize=None)
+def get_async_engine():
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from db.pool import InstrumentedAsyncQueuePool
+
+    url = make_url(_database_url()).set(drivername="postgresql+asyncpg")
+    connect_args = {}
+    if DB_PGBOUNCER:
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    return create_async_engine(url, connect_args=connect_args, **_pool_options(InstrumentedAsyncQueuePool))
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=get_async_engine()
+    )
+
+class LazySession(Session):
+    """A Session that binds to the engine when it first needs a connection."""
+
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            self.bind = get_engine()
+        return super().get_bind(*args, **kwargs)
 
 SessionLocal = sessionmaker(
+    class_=LazySession,
     autocommit=False,
     autoflush=False,
-    expire_on_commit=False,
-    bind=engine
+    expire_on_commit=False
 )
+
+def dispose_engines():
+    """Closes pooled connections of the engines created so far."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+
+def pool_status() -> list[tuple[dict, dict]]:
+    """(labels, status) of the pools created so far; NullPool engines are skipped."""
+    pools = []
+    if get_engine.cache_info().currsize:
+        pools.append(("sync", get_engine().pool))
+    if get_async_engine.cache_info().currsize:
+        pools.append(("async", get_async_engine().pool))
+
+    return [
+        ({"pool": label}, {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()})
+        for label, pool in pools
+        if isinstance(pool, QueuePool)
+    ]
+
+async def dispose_async_engine():
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine() if DB_ASYNC else None
+    if name == "AsyncSessionLocal":
+        return get_async_sessionmaker() if DB_ASYNC else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
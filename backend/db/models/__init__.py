@@ -3,4 +3,5 @@ from .class_ import Class
 from .booking import Booking
 from .admin import Admin
 from .template_class import TemplateClass
-from .subscription import Subscription
\ No newline at end of file
+from .subscription import Subscription
+from .schedule_version import ScheduleVersion
\ No newline at end of file
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import Column, DateTime, String, ForeignKey
+from sqlalchemy import Column, DateTime, Index, String, ForeignKey, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from zoneinfo import ZoneInfo
@@ -11,10 +11,16 @@ GREECE_TZ = ZoneInfo("Europe/Athens")
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_user_id_class_id", "user_id", "class_id"),
+        Index("ix_bookings_class_id_confirmed", "class_id", postgresql_where=text("status = 'confirmed'")),
+        Index("ix_bookings_user_id_class_id_confirmed", "user_id", "class_id", postgresql_where=text("status = 'confirmed'")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id"))
+    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id"), index=True)
+    subscription_id = Column(UUID(as_uuid=True), ForeignKey("subscriptions.id", ondelete="SET NULL"), nullable=True, index=True)
     status = Column(String, default="confirmed")
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(GREECE_TZ))
 
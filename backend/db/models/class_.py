@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Date, Integer, Time
+from sqlalchemy import Column, String, Date, Integer, Time, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -8,12 +8,15 @@ from db.database import Base
 
 class Class(Base):
     __tablename__ = "classes"
+    __table_args__ = (
+        UniqueConstraint("date", "time", "class_name", name="uq_classes_date_time_class_name"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     class_name = Column(String, nullable=False)
     date = Column(Date, nullable=False)
     time = Column(Time, nullable=False)
-    current_participants = Column(Integer, default=0)
+    current_participants = Column(Integer, default=0, server_default="0", nullable=False)
     max_participants = Column(Integer, default=10)
 
     bookings = relationship("Booking", back_populates="class_")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, DateTime, Integer, func
+
+from db.database import Base
+
+class ScheduleVersion(Base):
+    """Change counter of one class date, for conditional GETs.
+
+    Bumped in every transaction that changes the classes or bookings of that
+    date; a date that was never changed has no row.
+    """
+    __tablename__ = "schedule_versions"
+
+    date = Column(Date, primary_key=True)
+    version = Column(Integer, default=0, server_default="0", nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,7 +1,7 @@
 import enum
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Enum, String, Integer, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Enum, Index, String, Integer, DateTime, ForeignKey, Boolean, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from zoneinfo import ZoneInfo
@@ -30,6 +30,9 @@ class SubscriptionModel(str, enum.Enum):
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        Index("ix_subscriptions_user_id_start_date_end_date", "user_id", "start_date", "end_date"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -1,6 +1,6 @@
 import uuid
 import enum
-from sqlalchemy import Column, DateTime, String, Enum, Integer, Boolean
+from sqlalchemy import Column, DateTime, String, Enum, Index, Integer, Boolean, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -21,6 +21,12 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin member listing: keyset order and name/phone prefix search.
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_name_prefix", text("lower(name) text_pattern_ops")),
+        Index("ix_users_phone_prefix", "phone", postgresql_ops={"phone": "text_pattern_ops"}),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     phone = Column(String, unique=True, nullable=False)
@@ -31,6 +37,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(GREECE_TZ), nullable=False)
     role = Column(Enum(UserRole), nullable=True)
     has_accepted_terms = Column(Boolean, default=False, nullable=False)
+    # Bumped whenever the member's bookings or subscriptions change.
+    version = Column(Integer, default=0, server_default="0", nullable=False)
 
     bookings = relationship("Booking", back_populates="user")
     subscriptions = relationship("Subscription", back_populates="user", cascade="all, delete-orphan")
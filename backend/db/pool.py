@@ -0,0 +1,54 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from db import database
+from utils.metrics import Counter, Gauge, Histogram
+from utils.request_metrics import record_pool_wait
+
+# QueuePools that time every checkout. The wait is what a request spends
+# queued for a connection when the pool and its overflow are exhausted; a
+# checkout that gives up after pool_timeout is counted separately.
+
+checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    labels=("pool",)
+)
+checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout.",
+    labels=("pool",)
+)
+
+def _status(field: str):
+    return lambda: [(labels, status[field]) for labels, status in database.pool_status()]
+
+Gauge("db_pool_size", "Connections the pool keeps open.", _status("size"), labels=("pool",))
+Gauge("db_pool_checked_out", "Connections currently checked out.", _status("checked_out"), labels=("pool",))
+Gauge("db_pool_overflow", "Overflow connections in use (negative while the pool is not yet full).", _status("overflow"), labels=("pool",))
+
+class _TimedCheckout:
+    metrics_label = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.observe_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        self.observe_checkout(time.perf_counter() - started, timed_out=False)
+        return conn
+
+    def observe_checkout(self, wait: float, timed_out: bool):
+        checkout_wait.observe(wait, pool=self.metrics_label)
+        record_pool_wait(wait)
+        if timed_out:
+            checkout_timeouts.inc(pool=self.metrics_label)
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    metrics_label = "sync"
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_label = "async"
@@ -1,5 +1,5 @@
 from .user import UserSummary, UserBase, UserCreate, UserOut, LoginRequest, LoginResponse
-from .class_ import ClassSummary, ClassBase, ClassCreate, ClassOut, AdminClassSummary
+from .class_ import ClassSummary, ClassBase, ClassCreate, ClassOut, ClassPublicOut, AdminClassSummary
 from .booking import BookingBase, BookingCreate, BookingOut
 from .admin import AdminLogin
 from .template_class import TemplateClassBase, TemplateClassCreate, TemplateClassOut
\ No newline at end of file
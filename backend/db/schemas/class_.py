@@ -14,6 +14,17 @@ class ClassSummary(BaseModel):
     class Config:
         from_attributes = True
 
+class ClassPublicOut(BaseModel):
+    id: UUID
+    class_name: str
+    date: date
+    time: time
+    current_participants: int = 0
+    max_participants: int
+
+    class Config:
+        from_attributes = True
+
 class AdminClassSummary(BaseModel):
     id: UUID
     class_name: str
@@ -12,6 +12,8 @@ class LoginRequest(BaseModel):
 class LoginResponse(BaseModel):
     id: UUID
     has_accepted_terms: bool
+    # Signed member token; send it as "Authorization: Bearer <token>".
+    token: str
 
 class UserSummary(BaseModel):
     id: UUID
@@ -24,6 +26,25 @@ class UserSummary(BaseModel):
     class Config:
         from_attributes = True
 
+class UserListItem(BaseModel):
+    id: UUID
+    phone: str
+    password: Optional[int] = None
+    name: str
+    city: Optional[str] = None
+    gender: Optional[Gender] = None
+    role: Optional[UserRole] = None
+    created_at: Optional[datetime] = None
+    has_accepted_terms: bool
+
+    class Config:
+        from_attributes = True
+
+class UserListOut(UserListItem):
+    # Only present when requested through ?include=
+    bookings: Optional[List['BookingOut']] = None
+    subscriptions: Optional[List['SubscriptionOut']] = None
+
 class UserBase(BaseModel):
     phone: str
     password: Optional[int] = None
@@ -60,3 +81,4 @@ from db.schemas.booking import BookingOut
 from db.schemas.subscription import SubscriptionOut
 
 UserOut.model_rebuild()
+UserListOut.model_rebuild()
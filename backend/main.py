@@ -1,12 +1,34 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from routes import users, classes, bookings, admin_auth
-from db.database import engine, Base
+from routes import users, classes, bookings, admin_auth, async_api, exports, health, metrics
+from db.database import DB_ASYNC, dispose_async_engine, dispose_engines
+from utils.request_metrics import MetricsMiddleware
+from utils.serialization import DefaultResponse
+from utils.warmup import retry_warm_up, warm_up
 
-Base.metadata.create_all(bind=engine)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
-app = FastAPI()
+# The schema is managed by Alembic (`alembic upgrade head`), and the engine is
+# created on first use, so importing the app never touches the database.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    app.state.warmup = await warm_up()
+    app.state.ready = True
+    retry = asyncio.create_task(retry_warm_up(app.state)) if "error" in app.state.warmup else None
+    yield
+    app.state.ready = False
+    if retry:
+        retry.cancel()
+    dispose_engines()
+    await dispose_async_engine()
+
+app = FastAPI(default_response_class=DefaultResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,13 +43,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Outermost, so the latency it records covers the whole stack.
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/", tags=["Healtch Check"])
 def root():
     return {"message": "Breathe Pilates Booking API is running!"}
 
+# Routes are matched in registration order, so the async handlers shadow
+# their sync counterparts when async mode is on.
+if DB_ASYNC:
+    app.include_router(async_api.router)
+
+app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(users.router)
 app.include_router(classes.router)
 app.include_router(bookings.router)
 app.include_router(admin_auth.router)
+app.include_router(exports.router)
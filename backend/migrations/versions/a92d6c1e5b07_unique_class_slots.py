@@ -0,0 +1,32 @@
+"""Unique class slots
+
+Revision ID: a92d6c1e5b07
+Revises: f18b6e4a2c73
+Create Date: 2025-09-03 10:21:37.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a92d6c1e5b07'
+down_revision: Union[str, Sequence[str], None] = 'f18b6e4a2c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Schedule generation relies on ON CONFLICT (date, time, class_name). Fails
+    # if duplicate classes exist; merge their bookings before upgrading.
+    op.create_unique_constraint('uq_classes_date_time_class_name', 'classes', ['date', 'time', 'class_name'])
+    op.drop_index('ix_classes_date_time_class_name', table_name='classes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_classes_date_time_class_name', 'classes', ['date', 'time', 'class_name'], unique=False)
+    op.drop_constraint('uq_classes_date_time_class_name', 'classes', type_='unique')
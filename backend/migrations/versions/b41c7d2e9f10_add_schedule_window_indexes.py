@@ -0,0 +1,30 @@
+"""Add schedule window indexes
+
+Revision ID: b41c7d2e9f10
+Revises: a230a4ea63cc
+Create Date: 2025-08-20 10:14:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41c7d2e9f10'
+down_revision: Union[str, Sequence[str], None] = 'a230a4ea63cc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_classes_date_time', 'classes', ['date', 'time'], unique=False)
+    op.create_index(op.f('ix_bookings_class_id'), 'bookings', ['class_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_bookings_class_id'), table_name='bookings')
+    op.drop_index('ix_classes_date_time', table_name='classes')
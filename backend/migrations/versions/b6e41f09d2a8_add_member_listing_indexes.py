@@ -0,0 +1,34 @@
+"""Add member listing indexes
+
+Revision ID: b6e41f09d2a8
+Revises: a92d6c1e5b07
+Create Date: 2025-09-04 11:47:12.385920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e41f09d2a8'
+down_revision: Union[str, Sequence[str], None] = 'a92d6c1e5b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset order of GET /admin/users (newest first).
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    # Name and phone prefix search; text_pattern_ops serves LIKE 'x%' under any collation.
+    op.create_index('ix_users_name_prefix', 'users', [sa.text('lower(name) text_pattern_ops')], unique=False)
+    op.create_index('ix_users_phone_prefix', 'users', ['phone'], unique=False, postgresql_ops={'phone': 'text_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_phone_prefix', table_name='users')
+    op.drop_index('ix_users_name_prefix', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
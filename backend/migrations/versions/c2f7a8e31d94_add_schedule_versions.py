@@ -0,0 +1,33 @@
+"""Add schedule versions
+
+Revision ID: c2f7a8e31d94
+Revises: b6e41f09d2a8
+Create Date: 2025-09-08 09:32:05.118427
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f7a8e31d94'
+down_revision: Union[str, Sequence[str], None] = 'b6e41f09d2a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('schedule_versions',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('schedule_versions')
@@ -0,0 +1,45 @@
+"""Backfill classes.current_participants
+
+Revision ID: c7e2a9d40b15
+Revises: b41c7d2e9f10
+Create Date: 2025-08-22 16:03:12.847110
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9d40b15'
+down_revision: Union[str, Sequence[str], None] = 'b41c7d2e9f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        UPDATE classes
+        SET current_participants = counts.seats
+        FROM (
+            SELECT c.id AS class_id, count(b.id) AS seats
+            FROM classes c
+            LEFT JOIN bookings b ON b.class_id = c.id AND b.status = 'confirmed'
+            GROUP BY c.id
+        ) AS counts
+        WHERE classes.id = counts.class_id
+    """)
+    op.alter_column('classes', 'current_participants',
+               existing_type=sa.Integer(),
+               server_default=sa.text('0'),
+               nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('classes', 'current_participants',
+               existing_type=sa.Integer(),
+               server_default=None,
+               nullable=True)
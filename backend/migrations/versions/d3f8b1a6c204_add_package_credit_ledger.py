@@ -0,0 +1,62 @@
+"""Add package credit ledger
+
+Revision ID: d3f8b1a6c204
+Revises: c7e2a9d40b15
+Create Date: 2025-08-25 12:41:09.306528
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f8b1a6c204'
+down_revision: Union[str, Sequence[str], None] = 'c7e2a9d40b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PACKAGE_MODELS = "('package_10', 'package_15', 'package_20', 'cadillac_package_5', 'cadillac_package_10')"
+CADILLAC_PACKAGE_MODELS = "('cadillac_package_5', 'cadillac_package_10')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bookings', sa.Column('subscription_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('bookings_subscription_id_fkey', 'bookings', 'subscriptions', ['subscription_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_bookings_subscription_id'), 'bookings', ['subscription_id'], unique=False)
+
+    # Attribute every confirmed booking to the package that would have paid for it,
+    # then derive each package balance from its attributed bookings.
+    op.execute(f"""
+        UPDATE bookings b
+        SET subscription_id = (
+            SELECT s.id
+            FROM subscriptions s
+            JOIN classes c ON c.id = b.class_id
+            WHERE s.user_id = b.user_id
+              AND s.subscription_model::text IN {PACKAGE_MODELS}
+              AND s.start_date::date <= c.date
+              AND s.end_date::date >= c.date
+              AND (s.subscription_model::text IN {CADILLAC_PACKAGE_MODELS}) = (c.class_name ILIKE '%cadillac%')
+            ORDER BY s.end_date, s.id
+            LIMIT 1
+        )
+        WHERE b.status = 'confirmed'
+    """)
+    op.execute(f"""
+        UPDATE subscriptions s
+        SET remaining_classes = GREATEST(COALESCE(s.package_total, 0) - (
+            SELECT count(*) FROM bookings b
+            WHERE b.subscription_id = s.id AND b.status = 'confirmed'
+        ), 0)
+        WHERE s.subscription_model::text IN {PACKAGE_MODELS}
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_bookings_subscription_id'), table_name='bookings')
+    op.drop_constraint('bookings_subscription_id_fkey', 'bookings', type_='foreignkey')
+    op.drop_column('bookings', 'subscription_id')
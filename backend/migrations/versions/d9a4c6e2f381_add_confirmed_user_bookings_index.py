@@ -0,0 +1,31 @@
+"""Add confirmed user bookings index
+
+Revision ID: d9a4c6e2f381
+Revises: c2f7a8e31d94
+Create Date: 2025-09-10 11:24:37.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4c6e2f381'
+down_revision: Union[str, Sequence[str], None] = 'c2f7a8e31d94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Releasing a deleted member's seats counts their confirmed bookings per class.
+    op.create_index('ix_bookings_user_id_class_id_confirmed', 'bookings', ['user_id', 'class_id'], unique=False,
+                    postgresql_where=sa.text("status = 'confirmed'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_user_id_class_id_confirmed', table_name='bookings',
+                  postgresql_where=sa.text("status = 'confirmed'"))
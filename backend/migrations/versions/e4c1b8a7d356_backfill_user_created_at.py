@@ -0,0 +1,58 @@
+"""Backfill user created_at
+
+Revision ID: e4c1b8a7d356
+Revises: d9a4c6e2f381
+Create Date: 2025-09-11 10:05:48.631290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c1b8a7d356'
+down_revision: Union[str, Sequence[str], None] = 'd9a4c6e2f381'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables made by scripts/create_tables.py from older models may still have
+    # the naive column of 9614d3ad9f6f; its values are Athens local time.
+    op.execute("""
+        DO $$
+        BEGIN
+            IF (
+                SELECT data_type FROM information_schema.columns
+                WHERE table_name = 'users' AND column_name = 'created_at'
+            ) = 'timestamp without time zone' THEN
+                ALTER TABLE users ALTER COLUMN created_at TYPE timestamptz
+                USING created_at AT TIME ZONE 'Europe/Athens';
+            END IF;
+        END $$
+    """)
+    # Members from before created_at existed get their first subscription or
+    # booking, or else the oldest known date, so they stay at the end of the
+    # newest-first member list.
+    op.execute("""
+        UPDATE users
+        SET created_at = COALESCE(
+            (SELECT min(s.created_at) FROM subscriptions s WHERE s.user_id = users.id),
+            (SELECT min(b.created_at) FROM bookings b WHERE b.user_id = users.id),
+            (SELECT min(u.created_at) FROM users u),
+            now()
+        )
+        WHERE created_at IS NULL
+    """)
+    op.alter_column('users', 'created_at',
+               existing_type=sa.DateTime(timezone=True),
+               nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 6d5deb3c2e48 already declared the column NOT NULL; the backfilled dates are kept.
+    pass
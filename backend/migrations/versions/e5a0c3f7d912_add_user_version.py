@@ -0,0 +1,28 @@
+"""Add version to users
+
+Revision ID: e5a0c3f7d912
+Revises: d3f8b1a6c204
+Create Date: 2025-08-28 09:27:51.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0c3f7d912'
+down_revision: Union[str, Sequence[str], None] = 'd3f8b1a6c204'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text('0')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'version')
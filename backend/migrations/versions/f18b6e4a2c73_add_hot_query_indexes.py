@@ -0,0 +1,41 @@
+"""Add hot query indexes
+
+Revision ID: f18b6e4a2c73
+Revises: e5a0c3f7d912
+Create Date: 2025-09-02 15:08:44.920317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f18b6e4a2c73'
+down_revision: Union[str, Sequence[str], None] = 'e5a0c3f7d912'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicate-booking checks, entitlement snapshots and user deletion filter on user_id first.
+    op.create_index('ix_bookings_user_id_class_id', 'bookings', ['user_id', 'class_id'], unique=False)
+    # Occupancy recounts only look at confirmed bookings.
+    op.create_index('ix_bookings_class_id_confirmed', 'bookings', ['class_id'], unique=False,
+                    postgresql_where=sa.text("status = 'confirmed'"))
+    # Schedule windows, day rosters and schedule generation; supersedes (date, time).
+    op.create_index('ix_classes_date_time_class_name', 'classes', ['date', 'time', 'class_name'], unique=False)
+    op.drop_index('ix_classes_date_time', table_name='classes')
+    # Active subscription lookups and package credit debits.
+    op.create_index('ix_subscriptions_user_id_start_date_end_date', 'subscriptions', ['user_id', 'start_date', 'end_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_subscriptions_user_id_start_date_end_date', table_name='subscriptions')
+    op.create_index('ix_classes_date_time', 'classes', ['date', 'time'], unique=False)
+    op.drop_index('ix_classes_date_time_class_name', table_name='classes')
+    op.drop_index('ix_bookings_class_id_confirmed', table_name='bookings', postgresql_where=sa.text("status = 'confirmed'"))
+    op.drop_index('ix_bookings_user_id_class_id', table_name='bookings')
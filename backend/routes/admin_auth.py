@@ -1,27 +1,48 @@
+import logging
 from uuid import UUID, uuid4
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session, joinedload
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
+from db import database
 from db.models.admin import Admin
 from utils.db import get_db
-from utils.auth import get_current_admin, verify_password, create_access_token
+from utils.auth import get_current_admin, verify_and_update_password, create_access_token
+from utils.subscription import lock_user_bookings
+from utils.calc_class import debit_credit, refund_credit, is_package
+from utils.entitlements import bump_user_version, invalidate_entitlements
+from utils.cache import cache_stats
+from utils.conditional import cache_control, make_etag, set_validators
+from utils.response_cache import CachedResponse, cache_entry, respond, revalidate, schedule_cache
+from utils.versions import booked_dates, bump_date_versions, schedule_version
+from utils.passwords import password_pool
+from utils.schedule import generate_classes
+from utils.members import decode_member_cursor, list_members, member_cursor_key
+from utils.pagination import set_next_cursor
+from utils.serialization import fast_response
+from utils.occupancy import reserve_seat, remove_participant, remove_user_participants
+from utils.query_budget import query_budget
 from db.schemas.admin import AdminLogin
-from db.schemas.class_ import ClassOut, AdminClassSummary
+from db.schemas.class_ import ClassOut
 from db.schemas.booking import AdminBookingRequest, AdminBookingOut
 from db.models import template_class, class_ as class_model, booking as booking_model, user as user_model, subscription as sub_model
-from db.schemas.user import UserOut, UserCreate, UserSummary, UserMinimal, UserUpdateRequest
+from db.schemas.user import UserOut, UserListItem, UserListOut, UserCreate, UserSummary, UserMinimal, UserUpdateRequest
 from db.schemas.template_class import TemplateClassCreate
 from db.schemas.subscription import SubscriptionCreate, SubscriptionOut, SubscriptionUpdate
 
 GREECE_TZ = ZoneInfo("Europe/Athens")
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/admin/dev-token", tags=["Admin Login"])
+@query_budget(1)
 def dev_token(
     db: Session = Depends(get_db)
 ):
@@ -31,13 +52,26 @@ def dev_token(
     return {"access_token": create_access_token(admin)}
 
 @router.post("/admin/login", tags=["Admin Login"])
-def login_admin(
+@query_budget(2)
+async def login_admin(
     login_data: AdminLogin,
     db: Session = Depends(get_db)
 ):
-    admin = db.query(Admin).filter(Admin.username == login_data.username).first()
-    if not admin or not verify_password(login_data.password, admin.password):
+    # Async so bcrypt waits on its own pool instead of holding a threadpool
+    # thread; the blocking DB calls still go through the threadpool.
+    admin = await run_in_threadpool(
+        lambda: db.query(Admin).filter(Admin.username == login_data.username).first()
+    )
+    if not admin:
+        raise HTTPException(status_code=401, detail="Μη έγκυρα στοιχεία σύνδεσης.")
+
+    verified, new_hash = await verify_and_update_password(login_data.password, admin.password)
+    if not verified:
         raise HTTPException(status_code=401, detail="Μη έγκυρα στοιχεία σύνδεσης.")
+
+    if new_hash:
+        admin.password = new_hash
+        await run_in_threadpool(db.commit)
     
     access_token = create_access_token(admin)
 
@@ -57,10 +91,40 @@ def login_admin(
 
     return response
 
+classes_roster_adapter = TypeAdapter(List[ClassOut])
+
+def roster_etag(target_date: date, version: tuple) -> str:
+    return make_etag("roster", target_date, version)
+
+def render_roster(db: Session, target_date: date, today: date) -> CachedResponse:
+    """The classes of one day with their participants, serialized with its ETag."""
+    version, last_modified = schedule_version(db, target_date, target_date)
+    scratch = Response()
+    set_validators(
+        scratch,
+        roster_etag(target_date, version),
+        last_modified,
+        cache_control(past=target_date < today, private=True)
+    )
+
+    classes = (
+        db.query(class_model.Class)
+        .filter(class_model.Class.date == target_date)
+        .options(joinedload(class_model.Class.bookings).joinedload(booking_model.Booking.user))
+        .all()
+    )
+
+    for c in classes:
+        c.users = [b.user for b in c.bookings if b.user]
+
+    body = classes_roster_adapter.dump_json(classes_roster_adapter.validate_python(classes, from_attributes=True))
+    return cache_entry(scratch, body)
+
 @router.get("/admin/classes", response_model=List[ClassOut], tags=["Admin Classes"])
+@query_budget(4)
 def get_classes_by_day(
+    request: Request,
     date: str = Query(..., description="Date in YYYY-MM-DD format"),
-    db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin),
 ):
     try:
@@ -68,20 +132,26 @@ def get_classes_by_day(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
 
-    classes = (
-        db.query(class_model.Class)
-        .filter(class_model.Class.date == target_date)
-        .options(joinedload(class_model.Class.bookings).joinedload(booking_model.Booking.user))
-        .all()
-    )
+    today = datetime.now(GREECE_TZ).date()
 
-    for c in classes:
-        c.users = [b.user for b in c.bookings if b.user]
-        c.current_participants = len(c.users)
+    # Revalidations are answered from the day's version, before the roster is loaded.
+    if request.headers.get("if-none-match"):
+        with database.SessionLocal() as db:
+            version, last_modified = schedule_version(db, target_date, target_date)
+        unchanged = revalidate(
+            request, roster_etag(target_date, version), last_modified, cache_control(past=target_date < today, private=True)
+        )
+        if unchanged:
+            return unchanged
 
-    return classes
+    def load():
+        with database.SessionLocal() as db:
+            return render_roster(db, target_date, today)
+
+    return respond(request, schedule_cache.get(("roster", target_date), load))
 
 @router.post("/admin/users", response_model=UserOut, tags=["Admin Users"])
+@query_budget(5)
 def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
@@ -114,14 +184,47 @@ def create_user(
 
     return new_user
 
-@router.get("/admin/users", response_model=List[UserOut], tags=["Admin Users"])
+@router.get("/admin/users", response_model=List[UserListOut], response_model_exclude_unset=True, tags=["Admin Users"])
+@query_budget(4)
 def get_users(
+    request: Request,
+    response: Response,
+    role: Optional[user_model.UserRole] = Query(None),
+    city: Optional[str] = Query(None),
+    has_active_subscription: Optional[bool] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="Created at or after"),
+    created_to: Optional[datetime] = Query(None, description="Created before"),
+    q: Optional[str] = Query(None, min_length=1, description="Name or phone prefix"),
+    include: List[Literal["bookings", "subscriptions"]] = Query([], description="Relationships to embed"),
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
 ):
-    return db.query(user_model.User).all()
+    users = list_members(
+        db,
+        after=decode_member_cursor(cursor),
+        limit=limit,
+        include=set(include),
+        role=role,
+        city=city,
+        has_active_subscription=has_active_subscription,
+        created_from=created_from,
+        created_to=created_to,
+        search=q
+    )
+    users = set_next_cursor(response, users, limit, key=member_cursor_key)
+
+    items = []
+    for user_obj in users:
+        item = {name: getattr(user_obj, name) for name in UserListItem.model_fields}
+        for name in include:
+            item[name] = getattr(user_obj, name)
+        items.append(item)
+    return fast_response(request, List[UserListOut], items, response, exclude_unset=True)
 
 @router.post("/admin/generate_schedule", tags=["Admin Classes"])
+@query_budget(5)
 def generate_schedule(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
@@ -131,42 +234,17 @@ def generate_schedule(
     if start_date > end_date:
         raise HTTPException(status_code=400, detail="Start date must be before end date.")
     
-    templates = db.query(template_class.TemplateClass).filter(template_class.TemplateClass.is_active == True).all()
-    created_classes = []
-
-    days = (end_date - start_date).days + 1
-    for i in range(days):
-        current_date = start_date + timedelta(days=i)
-        weekday = current_date.weekday()
-
-        for template in templates:
-            if template.weekday == weekday:
-                exists = db.query(class_model.Class).filter(
-                    class_model.Class.date == current_date,
-                    class_model.Class.time == template.time,
-                    class_model.Class.class_name == template.class_name
-                ).first()
-
-                if not exists:
-                    new_class = class_model.Class(
-                        id=uuid4(),
-                        class_name = template.class_name,
-                        date=current_date,
-                        time=template.time,
-                        current_participants=0,
-                        max_participants=template.max_participants
-                    )
-                    db.add(new_class)
-                    created_classes.append(new_class)
-    
+    created, skipped = generate_classes(db, start_date, end_date)
     db.commit()
 
     return {
-        "created": len(created_classes),
-        "message": f"{len(created_classes)} classes created from {start_date} to {end_date}"
+        "created": created,
+        "skipped": skipped,
+        "message": f"{created} classes created from {start_date} to {end_date}"
     }
 
 @router.get("/admin/template_classes", tags=["Admin Classes"])
+@query_budget(2)
 def get_template_classes(
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
@@ -174,6 +252,7 @@ def get_template_classes(
     return db.query(template_class.TemplateClass).all()
 
 @router.get("/admin/bookings/{class_id}", response_model=List[UserMinimal], tags=["Admin Bookings"])
+@query_budget(2)
 def get_class_bookings(
     class_id: UUID,
     db: Session = Depends(get_db),
@@ -183,6 +262,7 @@ def get_class_bookings(
         db.query(booking_model.Booking)
         .filter(booking_model.Booking.class_id == class_id)
         .join(booking_model.Booking.user)
+        .options(contains_eager(booking_model.Booking.user))
         .all()
     )
 
@@ -196,12 +276,13 @@ def get_class_bookings(
     ]
 
 @router.post("/admin/bookings", tags=["Admin Bookings"])
+@query_budget(12)
 def admin_create_booking(
     data: AdminBookingRequest,
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
 ):
-    print("Searching for trainee name:", data.trainee_name)
+    logger.info("Admin booking for trainee name %r", data.trainee_name)
     cls_ = db.query(class_model.Class).filter(class_model.Class.id == data.class_id).first()
     if not cls_:
         raise HTTPException(status_code=404, detail="Το μάθημα δεν βρέθηκε.")
@@ -209,7 +290,8 @@ def admin_create_booking(
     user = (db.query(user_model.User).filter(user_model.User.name.ilike(f"%{data.trainee_name}%")).first())
     if not user:
         raise HTTPException(status_code=404, detail="Δεν υπάρχει ασκούμενος με αυτό το όνομα.")
-    
+
+    lock_user_bookings(db, user.id)
     existing = (
         db.query(booking_model.Booking)
         .filter(
@@ -221,19 +303,25 @@ def admin_create_booking(
     if existing:
         raise HTTPException(status_code=400, detail="Ο ασκούμενος έχει ήδη κλείσει θέση σε αυτό το μάθημα.")
 
+    reserve_seat(db, cls_.id)
+    # Admin bookings skip the subscription rules but still use a package credit when one applies.
+    paid_by = debit_credit(db, user.id, cls_)
+
     new_booking = booking_model.Booking(
         id = uuid4(),
         class_id = cls_.id,
         user_id = user.id,
+        subscription_id = paid_by.id if paid_by else None,
         created_at = datetime.now(GREECE_TZ)
     )
 
     db.add(new_booking)
+    bump_user_version(db, user.id)
+    bump_date_versions(db, cls_.date)
     db.commit()
+    invalidate_entitlements(user.id)
     db.refresh(new_booking)
 
-    # calculate_remaining_classes(user.id, db)
-
     return {
         "message": f"{user.name} booked successfully for {cls_.class_name} on {cls_.date} at {cls_.time}.",
         "user_id": str(user.id),
@@ -241,6 +329,7 @@ def admin_create_booking(
     }
 
 @router.delete("/admin/users/{user_id}", tags=["Admin Users"])
+@query_budget(10)
 def delete_user(
     user_id: UUID = Path(..., description="Το ID του χρήστη που θα διαγραφεί"),
     db: Session = Depends(get_db),
@@ -250,14 +339,19 @@ def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="Ο χρήστης δεν βρέθηκε.")
     
+    dates = booked_dates(db, user_id)
+    remove_user_participants(db, user_id)
     db.query(booking_model.Booking).filter(booking_model.Booking.user_id == user_id).delete()
 
     db.delete(user)
+    bump_date_versions(db, *dates)
     db.commit()
+    invalidate_entitlements(user_id)
 
     return {"message": f"Ο χρήστης με ID {user_id} διαγράφτηκε επιτυχώς."}
 
 @router.delete("/admin/bookings/{booking_id}", tags=["Admin Bookings"])
+@query_budget(8)
 def delete_booking(
     booking_id: UUID = Path(..., description="Το ID της κράτησης."),
     db: Session = Depends(get_db),
@@ -267,42 +361,52 @@ def delete_booking(
     if not booking:
         raise HTTPException(status_code=404, detail="Η κράτηση δεν βρέθηκε.")
     
+    remove_participant(db, booking)
+    refund_credit(db, booking)
+    bump_user_version(db, booking.user_id)
     db.delete(booking)
+    bump_date_versions(db, booking.class_.date)
     db.commit()
-
-    # calculate_remaining_classes(booking.user_id, db)
+    invalidate_entitlements(booking.user_id)
 
     return {"message": f"Η κράτηση με ID {booking_id} διαγράφηκε επιτυχώς."}
 
 @router.get("/admin/bookings", response_model= List[AdminBookingOut], tags=["Admin Bookings"])
+@query_budget(2)
 def get_bookings(
+    request: Request,
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
 ):
-    bookings = (
-        db.query(booking_model.Booking)
+    rows = (
+        db.query(
+            booking_model.Booking.id,
+            user_model.User.name,
+            class_model.Class.id,
+            class_model.Class.class_name,
+            class_model.Class.date,
+            class_model.Class.time
+        )
         .join(booking_model.Booking.user)
         .join(booking_model.Booking.class_)
         .all()
     )
 
-    return [
-        AdminBookingOut(
-            booking_id = booking.id,
-            user_name = booking.user.name,
-            class_ = AdminClassSummary(
-                id=booking.class_.id,
-                class_name=booking.class_.class_name,
-                date=booking.class_.date,
-                time=booking.class_.time
-            )
-        )
-        for booking in bookings
+    bookings = [
+        {
+            "booking_id": booking_id,
+            "user_name": user_name,
+            "class_": {"id": class_id, "class_name": class_name, "date": class_date, "time": class_time}
+        }
+        for booking_id, user_name, class_id, class_name, class_date, class_time in rows
     ]
+    return fast_response(request, List[AdminBookingOut], bookings)
 
 @router.get("/admin/users/{user_id}/bookings", response_model=List[AdminBookingOut], tags=["Admin Users"])
+@query_budget(3)
 def get_user_bookings(
     user_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
 ):
@@ -317,21 +421,14 @@ def get_user_bookings(
         .all()
     )
 
-    return [
-        AdminBookingOut(
-            booking_id = booking.id,
-            user_name = user.name,
-            class_ = AdminClassSummary(
-                id = booking.class_.id,
-                class_name = booking.class_.class_name,
-                date = booking.class_.date,
-                time = booking.class_.time
-            )
-        )
+    bookings = [
+        {"booking_id": booking.id, "user_name": user.name, "class_": booking.class_}
         for booking in bookings
     ]
+    return fast_response(request, List[AdminBookingOut], bookings)
 
 @router.put("/admin/users/{user_id}", tags=["Admin Users"])
+@query_budget(6)
 def update_user(
     user_id: UUID,
     data: UserUpdateRequest,
@@ -345,16 +442,21 @@ def update_user(
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
 
+    # The profile and the upcoming rosters show the member's details.
+    bump_user_version(db, user_id)
+    bump_date_versions(db, *booked_dates(db, user_id, since=datetime.now(GREECE_TZ).date()))
     db.commit()
     return {"detail": "Τα στοιχεία του χρήστη ανανεώθηκαν επιτυχώς."}
 
 @router.get("/admin/subscriptions", tags=["Admin Subscriptions"])
+@query_budget(1)
 def get_subscription_models(
     admin: Admin = Depends(get_current_admin)
 ):
     return [model.value for model in sub_model.SubscriptionModel]
 
 @router.get("/subscriptions/{user_id}", response_model=List[SubscriptionOut], tags=["Admin Subscriptions"])
+@query_budget(3)
 def get_user_subscriptions(
     user_id: UUID,
     db: Session = Depends(get_db),
@@ -367,6 +469,7 @@ def get_user_subscriptions(
     return user.subscriptions
 
 @router.delete("/admin/classes/{class_id}", tags=["Admin Classes"])
+@query_budget(5)
 def delete_class(
     class_id: UUID,
     db: Session = Depends(get_db),
@@ -377,17 +480,18 @@ def delete_class(
         raise HTTPException(status_code=404, detail="Το τμήμα δεν βρέθηκε.")
     
     active_bookings = db.query(booking_model.Booking).filter(booking_model.Booking.class_id == class_id).count()
-    print(active_bookings)
 
     if active_bookings > 0:
         raise HTTPException(status_code=404, detail="Το τμήμα έχει κρατήσεις.")
     
     db.delete(class_obj)
+    bump_date_versions(db, class_obj.date)
     db.commit()
     
     return {"detail": "Το τμήμα διαγράφηκε επιτυχώς."}
 
 @router.post("/admin/template_classes/", tags=["Admin Classes"])
+@query_budget(3)
 def create_template_class(
     data: TemplateClassCreate,
     db: Session = Depends(get_db),
@@ -408,6 +512,7 @@ def create_template_class(
     return new_template
 
 @router.delete("/admin/template_classes/{template_id}", tags=["Admin Classes"])
+@query_budget(3)
 def delete_template_class(
     template_id: UUID,
     db: Session = Depends(get_db),
@@ -423,6 +528,7 @@ def delete_template_class(
     return {"detail": "Το μάθημα διαγράφηκε με επιτυχία."}
 
 @router.post("/admin/subscriptions/{user_id}", response_model=SubscriptionOut, tags=["Admin Subscriptions"])
+@query_budget(5)
 def create_subscription(
     user_id: UUID,
     data: SubscriptionCreate,
@@ -438,12 +544,17 @@ def create_subscription(
         user_id=user_id,
         **data.model_dump()
     )
+    if is_package(new_subscription.subscription_model) and new_subscription.remaining_classes is None:
+        new_subscription.remaining_classes = new_subscription.package_total
     db.add(new_subscription)
+    bump_user_version(db, user_id)
     db.commit()
+    invalidate_entitlements(user_id)
     db.refresh(new_subscription)
     return new_subscription
 
 @router.put("/admin/subscriptions/{subscription_id}", response_model=SubscriptionOut, tags=["Admin Subscriptions"])
+@query_budget(5)
 def update_subscription(
     subscription_id: UUID,
     data: SubscriptionUpdate,
@@ -454,14 +565,26 @@ def update_subscription(
     if not subscription:
         raise HTTPException(status_code=404, detail="Η συνδρομή δεν βρέθηκε.")
 
-    for key, value in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(exclude_unset=True)
+    # Resizing a package keeps the classes already used and moves the balance with it.
+    if "package_total" in changes and "remaining_classes" not in changes and subscription.remaining_classes is not None:
+        delta = (changes["package_total"] or 0) - (subscription.package_total or 0)
+        changes["remaining_classes"] = max(0, subscription.remaining_classes + delta)
+
+    for key, value in changes.items():
         setattr(subscription, key, value)
 
+    if is_package(subscription.subscription_model) and subscription.remaining_classes is None:
+        subscription.remaining_classes = subscription.package_total
+
+    bump_user_version(db, subscription.user_id)
     db.commit()
+    invalidate_entitlements(subscription.user_id)
     db.refresh(subscription)
     return subscription
 
 @router.delete("/admin/subscriptions/{subscription_id}", tags=["Admin Subscriptions"])
+@query_budget(4)
 def delete_subscription(
     subscription_id: UUID,
     db: Session = Depends(get_db),
@@ -472,5 +595,21 @@ def delete_subscription(
         raise HTTPException(status_code=404, detail="Η συνδρομή δεν βρέθηκε.")
 
     db.delete(subscription)
+    bump_user_version(db, subscription.user_id)
     db.commit()
+    invalidate_entitlements(subscription.user_id)
     return {"detail": "Η συνδρομή διαγράφηκε επιτυχώς."}
+
+@router.get("/admin/cache_stats", tags=["Admin Monitoring"])
+@query_budget(1)
+def get_cache_stats(
+    admin: Admin = Depends(get_current_admin)
+):
+    return cache_stats()
+
+@router.get("/admin/password_pool_stats", tags=["Admin Monitoring"])
+@query_budget(1)
+def get_password_pool_stats(
+    admin: Admin = Depends(get_current_admin)
+):
+    return password_pool.stats()
@@ -0,0 +1,139 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from zoneinfo import ZoneInfo
+
+from db import database
+from db.models import user as user_model
+from db.schemas.booking import BookingCreate, BookingOut
+from db.schemas.class_ import ClassPublicOut
+from db.schemas.user import UserOut, LoginRequest, LoginResponse
+from routes.classes import SCHEDULE_WINDOW_DAYS, MAX_SCHEDULE_WINDOW_DAYS, classes_etag, render_classes_page
+from utils.bookings import book_class, booking_outcomes, cancel_member_booking, upcoming_bookings
+from utils.conditional import cache_control, is_not_modified, make_etag, not_modified, set_validators
+from utils.db import get_async_db, get_current_user
+from utils.member_tokens import MemberIdentity, create_member_token
+from utils.entitlements import invalidate_entitlements
+from utils.response_cache import respond, revalidate, schedule_cache
+from utils.schedule import decode_schedule_cursor
+from utils.versions import profile_version, schedule_version
+from utils.query_budget import query_budget
+
+# Async versions of the hot member routes, mounted ahead of the sync routers
+# when DB_ASYNC=true. Request/response contracts are identical; the shared
+# booking and schedule helpers run on the async session through run_sync.
+
+router = APIRouter()
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+@router.get("/classes", response_model=List[ClassPublicOut], tags=["Classes"])
+@query_budget(3)
+async def get_class(
+    request: Request,
+    start_date: Optional[date] = Query(None, description="First day of the window (YYYY-MM-DD), defaults to today"),
+    days: int = Query(SCHEDULE_WINDOW_DAYS, ge=1, le=MAX_SCHEDULE_WINDOW_DAYS, description="Number of days in the window"),
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header of the previous page"),
+    limit: int = Query(500, ge=1, le=1000)
+):
+    today = datetime.now(GREECE_TZ).date()
+    start_date = start_date or today
+    end_date = start_date + timedelta(days=days - 1)
+    decode_schedule_cursor(cursor)
+
+    if request.headers.get("if-none-match"):
+        async with database.AsyncSessionLocal() as db:
+            version, last_modified = await db.run_sync(schedule_version, start_date, end_date)
+        unchanged = revalidate(
+            request, classes_etag(start_date, end_date, cursor, limit, version),
+            last_modified, cache_control(past=end_date < today)
+        )
+        if unchanged:
+            return unchanged
+
+    async def load():
+        async with database.AsyncSessionLocal() as db:
+            return await db.run_sync(render_classes_page, start_date, end_date, cursor, limit, today)
+
+    cached = await schedule_cache.aget(("classes", start_date, end_date, cursor, limit), load)
+    return respond(request, cached)
+
+@router.post("/bookings", response_model=BookingOut, status_code=status.HTTP_201_CREATED, tags=["Bookings"])
+@query_budget(11)
+async def create_booking(
+    booking_data: BookingCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: MemberIdentity = Depends(get_current_user),
+):
+    new_booking = await db.run_sync(book_class, current_user, booking_data)
+    await db.commit()
+    invalidate_entitlements(current_user.id)
+    booking_outcomes.inc(outcome="success")
+
+    return new_booking
+
+@router.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Bookings"])
+@query_budget(8)
+async def cancel_booking(
+    booking_id: UUID,
+    current_user: MemberIdentity = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    await db.run_sync(cancel_member_booking, current_user, booking_id)
+    await db.commit()
+    invalidate_entitlements(current_user.id)
+
+    return
+
+@router.post("/login", response_model=LoginResponse, tags=["Login"])
+@query_budget(1)
+async def login(
+    data: LoginRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_user = await db.scalar(select(user_model.User).where(user_model.User.phone == data.phone))
+    if not db_user or db_user.password != data.password:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    return {
+        "id": db_user.id,
+        "has_accepted_terms": db_user.has_accepted_terms,
+        "token": create_member_token(db_user)
+    }
+
+@router.get("/users/{user_id}", response_model=UserOut, tags=["Users"])
+@query_budget(5)
+async def get_user(
+    user_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    today = datetime.now(GREECE_TZ).date()
+    version = await db.run_sync(profile_version, user_id, today)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    set_validators(response, make_etag("user", user_id, today, version), cache=cache_control(private=True))
+    if is_not_modified(request, response.headers["ETag"]):
+        return not_modified(response)
+
+    user_obj = (
+        await db.execute(
+            select(user_model.User)
+            .options(
+                upcoming_bookings(today),
+                selectinload(user_model.User.subscriptions)
+            )
+            .where(user_model.User.id == user_id)
+        )
+    ).scalar_one_or_none()
+
+    if not user_obj:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return user_obj
@@ -1,26 +1,86 @@
-from typing import List
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from zoneinfo import ZoneInfo
 
-from db.models import booking, class_
-from db.schemas.class_ import ClassOut
-from utils.db import get_db
+from db import database
+from db.schemas.class_ import ClassPublicOut
+from utils.conditional import cache_control, make_etag, set_validators
+from utils.pagination import set_next_cursor
+from utils.response_cache import CachedResponse, cache_entry, respond, revalidate, schedule_cache
+from utils.schedule import decode_schedule_cursor, get_schedule_window, schedule_cursor_key
+from utils.versions import schedule_version
+from utils.query_budget import query_budget
 
 router = APIRouter()
 
-@router.get("/classes", response_model=List[ClassOut], tags=["Classes"])
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+SCHEDULE_WINDOW_DAYS = 14
+MAX_SCHEDULE_WINDOW_DAYS = 62
+
+classes_adapter = TypeAdapter(List[ClassPublicOut])
+
+def classes_etag(start_date: date, end_date: date, cursor: str | None, limit: int, version: tuple) -> str:
+    return make_etag("classes", start_date, end_date, cursor, limit, version)
+
+def render_classes_page(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    cursor: str | None,
+    limit: int,
+    today: date
+) -> CachedResponse:
+    """One page of the schedule, serialized with its ETag and cursor headers."""
+    version, last_modified = schedule_version(db, start_date, end_date)
+    scratch = Response()
+    set_validators(
+        scratch,
+        classes_etag(start_date, end_date, cursor, limit, version),
+        last_modified,
+        cache_control(past=end_date < today)
+    )
+
+    classes = get_schedule_window(db, start_date, end_date, after=decode_schedule_cursor(cursor), limit=limit)
+    classes = set_next_cursor(scratch, classes, limit, key=schedule_cursor_key)
+
+    body = classes_adapter.dump_json(classes_adapter.validate_python(classes, from_attributes=True))
+    return cache_entry(scratch, body)
+
+@router.get("/classes", response_model=List[ClassPublicOut], tags=["Classes"])
+@query_budget(3)
 def get_class(
-    db: Session = Depends(get_db)
+    request: Request,
+    start_date: Optional[date] = Query(None, description="First day of the window (YYYY-MM-DD), defaults to today"),
+    days: int = Query(SCHEDULE_WINDOW_DAYS, ge=1, le=MAX_SCHEDULE_WINDOW_DAYS, description="Number of days in the window"),
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header of the previous page"),
+    limit: int = Query(500, ge=1, le=1000)
 ):
-    classes = (
-        db.query(class_.Class)
-        .options(joinedload(class_.Class.bookings).joinedload(booking.Booking.user))
-        .all()
-    )
+    today = datetime.now(GREECE_TZ).date()
+    start_date = start_date or today
+    end_date = start_date + timedelta(days=days - 1)
+    # Rejects a bad cursor before it reaches the cache.
+    decode_schedule_cursor(cursor)
 
-    for c in classes:
-        c.users = [b.user for b in c.bookings if b.user]
-        c.current_participants = len(c.users)
+    # A revalidation is answered from the version of the window alone; the
+    # page is only loaded, or taken from the cache, when the client's copy is out of date.
+    if request.headers.get("if-none-match"):
+        with database.SessionLocal() as db:
+            version, last_modified = schedule_version(db, start_date, end_date)
+        unchanged = revalidate(
+            request, classes_etag(start_date, end_date, cursor, limit, version),
+            last_modified, cache_control(past=end_date < today)
+        )
+        if unchanged:
+            return unchanged
 
-    return classes
+    # Loads use their own session: a stale entry is refreshed after this request has ended.
+    def load():
+        with database.SessionLocal() as db:
+            return render_classes_page(db, start_date, end_date, cursor, limit, today)
 
+    cached = schedule_cache.get(("classes", start_date, end_date, cursor, limit), load)
+    return respond(request, cached)
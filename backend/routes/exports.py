@@ -0,0 +1,63 @@
+from datetime import date, datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from db.models.admin import Admin
+from db.models.user import UserRole
+from utils.auth import get_current_admin
+from utils.export import (
+    MEDIA_TYPES, bookings_export_query, stream_export, subscriptions_export_query, users_export_query
+)
+from utils.query_budget import query_budget
+
+router = APIRouter()
+
+ExportFormat = Literal["csv", "ndjson"]
+
+def export_response(stmt, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(stmt, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+@router.get("/admin/export/bookings", tags=["Admin Exports"])
+@query_budget(2)
+def export_bookings(
+    start_date: Optional[date] = Query(None, description="First class date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Last class date (YYYY-MM-DD)"),
+    format: ExportFormat = Query("csv"),
+    admin: Admin = Depends(get_current_admin)
+):
+    return export_response(bookings_export_query(start_date, end_date), format, "bookings")
+
+@router.get("/admin/export/users", tags=["Admin Exports"])
+@query_budget(2)
+def export_users(
+    created_from: Optional[datetime] = Query(None, description="Created at or after"),
+    created_to: Optional[datetime] = Query(None, description="Created before"),
+    role: Optional[UserRole] = Query(None),
+    city: Optional[str] = Query(None),
+    has_active_subscription: Optional[bool] = Query(None),
+    format: ExportFormat = Query("csv"),
+    admin: Admin = Depends(get_current_admin)
+):
+    stmt = users_export_query(
+        role=role,
+        city=city,
+        has_active_subscription=has_active_subscription,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return export_response(stmt, format, "users")
+
+@router.get("/admin/export/subscriptions", tags=["Admin Exports"])
+@query_budget(2)
+def export_subscriptions(
+    start_date: Optional[date] = Query(None, description="Subscriptions active on or after (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Subscriptions active on or before (YYYY-MM-DD)"),
+    format: ExportFormat = Query("csv"),
+    admin: Admin = Depends(get_current_admin)
+):
+    return export_response(subscriptions_export_query(start_date, end_date), format, "subscriptions")
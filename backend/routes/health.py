@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from db import database
+from utils.query_budget import query_budget
+
+router = APIRouter()
+
+@router.get("/healthz", tags=["Healtch Check"])
+@query_budget(0)
+def liveness():
+    """The process is up and serving; never touches the database."""
+    return {"status": "ok"}
+
+@router.get("/readyz", tags=["Healtch Check"])
+@query_budget(1)
+def readiness(request: Request):
+    """Ready once startup and warmup are done and the database answers."""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    if "error" in request.app.state.warmup:
+        return JSONResponse(status_code=503, content={"status": "warming up", "warmup": request.app.state.warmup})
+
+    try:
+        with database.get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception:
+        return JSONResponse(status_code=503, content={"status": "database unavailable"})
+
+    return {"status": "ready", "warmup": request.app.state.warmup}
@@ -0,0 +1,24 @@
+import hmac
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+import db.pool  # registers the db_pool_* metrics
+from utils import metrics
+from utils.query_budget import query_budget
+
+router = APIRouter()
+
+# When set, scrapers must send it as a bearer token.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["Admin Monitoring"])
+@query_budget(0)
+def get_metrics(request: Request):
+    """This worker's metrics in the Prometheus text format."""
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, METRICS_TOKEN):
+            raise HTTPException(status_code=401, detail="Μη έγκυρο token.")
+
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
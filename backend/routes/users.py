@@ -1,21 +1,32 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, selectinload
 from zoneinfo import ZoneInfo
 
-from db.models import booking, user as user_model
+from db.models import user as user_model
+from db.models.user import UserRole
+from db.schemas.booking import BookingOut
 from db.schemas.user import UserOut, LoginRequest, LoginResponse
 from db.schemas.subscription import SubscriptionOut
-from utils.db import get_db
+from utils.bookings import get_booking_history, history_cursor_key, upcoming_bookings
+from utils.conditional import cache_control, is_not_modified, make_etag, not_modified, set_validators
+from utils.db import get_current_user, get_db
 from utils.calc_class import calculate_remaining_classes, calculate_remaining_classes_for_subscription
+from utils.entitlements import get_entitlements
+from utils.member_tokens import MemberIdentity, create_member_token
+from utils.pagination import set_next_cursor
+from utils.schedule import decode_schedule_cursor
+from utils.versions import profile_version
+from utils.query_budget import query_budget
 
 router = APIRouter()
 
 GREECE_TZ = ZoneInfo("Europe/Athens")
 
 @router.post("/login", response_model=LoginResponse, tags=["Login"])
+@query_budget(1)
 def login(
     data: LoginRequest,
     db: Session = Depends(get_db)
@@ -26,17 +37,30 @@ def login(
 
     return {
         "id": db_user.id,
-        "has_accepted_terms": db_user.has_accepted_terms
+        "has_accepted_terms": db_user.has_accepted_terms,
+        "token": create_member_token(db_user)
     }
 
 @router.get("/users/{user_id}", response_model=UserOut, tags=["Users"])
+@query_budget(5)
 def get_user(
     user_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
+    today = datetime.now(GREECE_TZ).date()
+    version = profile_version(db, user_id, today)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    set_validators(response, make_etag("user", user_id, today, version), cache=cache_control(private=True))
+    if is_not_modified(request, response.headers["ETag"]):
+        return not_modified(response)
+
     user_obj = (
         db.query(user_model.User)
-        .options(joinedload(user_model.User.bookings).joinedload(booking.Booking.class_))
+        .options(upcoming_bookings(today), selectinload(user_model.User.subscriptions))
         .filter(user_model.User.id == user_id)
         .first()
     )
@@ -44,51 +68,50 @@ def get_user(
     if not user_obj:
         raise HTTPException(status_code=404, detail="User not found")
 
-    for b in user_obj.bookings:
-        if b.class_:
-            b.class_.current_participants = len([
-                bk for bk in b.class_.bookings
-                if bk.status == "confirmed"
-            ])
-
     return user_obj
 
+@router.get("/users/{user_id}/bookings/history", response_model=List[BookingOut], tags=["Users"])
+@query_budget(1)
+def get_user_booking_history(
+    user_id: UUID,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header of the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: MemberIdentity = Depends(get_current_user)
+):
+    if current_user.id != user_id and current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="Δεν έχετε δικαίωμα να δείτε αυτές τις κρατήσεις.")
+
+    today = datetime.now(GREECE_TZ).date()
+    # History pages share the (date, time, id) cursor shape of the schedule.
+    after = decode_schedule_cursor(cursor)
+    bookings = get_booking_history(db, user_id, today, after=after, limit=limit)
+
+    return set_next_cursor(response, bookings, limit, key=history_cursor_key)
+
 @router.post("/subscription", response_model=List[SubscriptionOut], tags=["Subscription"])
+@query_budget(3)
 def get_user_subscription(
     user_id: UUID,
     db: Session = Depends(get_db)
 ):
-    user_obj = (
-        db.query(user_model.User)
-        .options(joinedload(user_model.User.bookings).joinedload(booking.Booking.class_))
-        .filter(user_model.User.id == user_id)
-        .first()
-    )
-
-    if not user_obj:
+    entitlements = get_entitlements(db, user_id)
+    if not entitlements:
         raise HTTPException(status_code=404, detail="Ο χρήστης δεν βρέθηκε.")
-    
-    now = datetime.now(GREECE_TZ)
-    active_subs = [
-        sub for sub in user_obj.subscriptions
-        if sub.start_date <= now <= sub.end_date
-    ]
 
-    return active_subs
+    return entitlements.active_subscriptions(datetime.now(GREECE_TZ))
 
 @router.post("/users/{user_id}/remaining_classes", tags=["Users"])
+@query_budget(3)
 def get_remaining_classes(
     user_id: UUID,
     db: Session = Depends(get_db)
 ):
-    user = db.query(user_model.User).filter(user_model.User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Ο χρήστης δεν βρέθηκε.")
-    
-    remaining = calculate_remaining_classes(user_id=str(user_id), db=db)
-    return remaining
+    return calculate_remaining_classes(user_id=user_id, db=db)
 
 @router.get("/users/{user_id}/subscriptions/{subscription_id}/remaining_classes", tags=["Users"])
+@query_budget(1)
 def get_remaining_classes_for_subscription(
     user_id: UUID,
     subscription_id: UUID,
@@ -97,6 +120,7 @@ def get_remaining_classes_for_subscription(
     return calculate_remaining_classes_for_subscription(str(user_id), str(subscription_id), db)
 
 @router.post("/users/{user_id}/accept_terms", tags=["Users"])
+@query_budget(2)
 def accept_terms(
     user_id: UUID,
     db: Session = Depends(get_db)
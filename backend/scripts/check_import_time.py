@@ -0,0 +1,72 @@
+"""Import-time budget check for the API.
+
+Imports `main` in fresh interpreters, with DB_URL pointing at a port nothing
+listens on, and fails (exit status 1) if the best run takes longer than
+IMPORT_TIME_BUDGET_MS, if the import creates an engine, or if it prints
+anything. Lists the slowest modules from `python -X importtime` to show where
+the time goes.
+
+    python -m scripts.check_import_time
+"""
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+RUNS = 3
+SLOWEST = 10
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - started) * 1000
+from db import database
+print(json.dumps({"ms": elapsed, "engines": database.get_engine.cache_info().currsize}))
+"""
+
+def import_once() -> tuple[dict, str, str]:
+    env = {**os.environ, "DB_URL": "postgresql://nobody@127.0.0.1:1/unreachable"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        capture_output=True, text=True, env=env, timeout=60
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing main failed:\n{result.stderr}")
+
+    *printed, last = result.stdout.splitlines() or [""]
+    return json.loads(last), "\n".join(printed), result.stderr
+
+def slowest_modules(importtime: str) -> list:
+    """(cumulative µs, module) pairs from -X importtime output, slowest first."""
+    modules = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:SLOWEST]
+
+def main():
+    runs = [import_once() for _ in range(RUNS)]
+    best, printed, importtime = min(runs, key=lambda run: run[0]["ms"])
+
+    for cumulative, name in slowest_modules(importtime):
+        print(f"{cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if best["ms"] > IMPORT_TIME_BUDGET_MS:
+        failures.append(f"import took {best['ms']:.0f} ms, budget is {IMPORT_TIME_BUDGET_MS:.0f} ms")
+    if best["engines"]:
+        failures.append("importing main created a database engine")
+    if printed:
+        failures.append(f"importing main printed:\n{printed}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"import main: {best['ms']:.0f} ms (best of {RUNS})")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Query budget and N+1 check for every route.
+
+Seeds the scratch database in BENCH_DB_URL (its tables are dropped and
+recreated), sends each route a request through the app with cold caches, and
+exits with status 1 when a request runs more statements than its route's
+@query_budget, runs one statement shape more often than the route allows (a
+likely N+1), gets any status but the one its real path returns, or when a
+route in routes/ declares no budget at all. Requires httpx for the
+TestClient. Run it a second time with DB_ASYNC=true to cover the async
+handlers.
+
+    python -m scripts.check_query_budgets
+"""
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, time, timedelta
+
+os.environ["QUERY_BUDGET_CHECK"] = "true"
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from benchmarks.common import GREECE_TZ, bench_engine, bench_session, reset_schema, seed_bookings, seed_classes, seed_users
+from db import database
+from db.models import Admin, Booking, Class, Subscription, TemplateClass, User
+from db.models.subscription import SubscriptionModel
+from utils import query_budget
+from utils.auth import create_access_token
+from utils.cache import caches
+from utils.member_tokens import create_member_token
+
+def seed(engine) -> dict:
+    rng = random.Random(7)
+    now = datetime.now(GREECE_TZ)
+    today = now.date()
+
+    reset_schema(engine)
+    with engine.begin() as conn:
+        user_ids = seed_users(conn, 300)
+        class_ids = seed_classes(conn, today - timedelta(days=14), 28, 12)
+        seed_bookings(conn, class_ids, user_ids, 6, rng)
+
+    with bench_session(engine)() as db:
+        admin = Admin(username="budget", password="-", email="budget@example.com")
+        member = User(phone="6999999999", password=424242, name="Budget Member", created_at=now, has_accepted_terms=True)
+        db.add_all([admin, member])
+        db.flush()
+
+        db.add_all([
+            Subscription(user_id=member.id, subscription_model=SubscriptionModel.subscription_5,
+                         start_date=now - timedelta(days=7), end_date=now + timedelta(days=60)),
+            Subscription(user_id=member.id, subscription_model=SubscriptionModel.package_10,
+                         start_date=now - timedelta(days=7), end_date=now + timedelta(days=60),
+                         package_total=10, remaining_classes=10),
+            TemplateClass(class_name="Pilates Mat", weekday=0, time=time(9, 0), max_participants=10),
+        ])
+
+        upcoming = list(db.query(Class).filter(Class.date >= today + timedelta(days=3)).order_by(Class.date, Class.time).limit(2))
+        past = db.query(Class).filter(Class.date < today).first()
+        db.add(Booking(user_id=member.id, class_id=past.id, status="confirmed", created_at=now))
+
+        empty = Class(class_name="Budget Empty", date=today + timedelta(days=5), time=time(22, 0), max_participants=10)
+        db.add(empty)
+        db.commit()
+
+        return {
+            "admin_token": create_access_token(admin),
+            "member_token": create_member_token(member),
+            "member": member,
+            "book": upcoming[0],
+            "admin_book": upcoming[1],
+            "empty": empty,
+            "today": today,
+        }
+
+def drive(client: TestClient, s: dict) -> list[str]:
+    """Sends every route its request; returns the requests that got an unexpected status.
+
+    A request that fails early runs fewer statements than the real path, so
+    its measurements are dropped rather than checked against the budget.
+    """
+    admin = {"Authorization": f"Bearer {s['admin_token']}"}
+    member = {"Authorization": f"Bearer {s['member_token']}"}
+    user_id, today = s["member"].id, s["today"]
+    failures = []
+
+    def call(method: str, path: str, expect: int = 200, **kwargs):
+        for cache in caches.values():
+            cache.clear()
+        measured = len(query_budget.measurements)
+        response = client.request(method, path, **kwargs)
+        if response.status_code != expect:
+            del query_budget.measurements[measured:]
+            failures.append(f"{method} {path}: HTTP {response.status_code}, expected {expect}")
+            return None
+        return response
+
+    call("GET", "/healthz")
+    call("GET", "/readyz")
+    call("GET", "/metrics")
+    call("GET", "/classes")
+    call("POST", "/login", json={"phone": s["member"].phone, "password": s["member"].password})
+    call("GET", f"/users/{user_id}")
+    call("GET", f"/users/{user_id}/bookings/history", headers=member)
+    call("POST", "/subscription", params={"user_id": str(user_id)})
+    call("POST", f"/users/{user_id}/remaining_classes")
+    subscriptions = call("GET", f"/subscriptions/{user_id}", headers=admin)
+    if subscriptions and subscriptions.json():
+        call("GET", f"/users/{user_id}/subscriptions/{subscriptions.json()[0]['id']}/remaining_classes")
+    call("POST", f"/users/{user_id}/accept_terms")
+
+    booking = call("POST", "/bookings", expect=201, json={"class_id": str(s["book"].id)}, headers=member)
+    if booking:
+        call("DELETE", f"/bookings/{booking.json()['id']}", expect=204, headers=member)
+
+    call("GET", "/admin/dev-token")
+    call("GET", "/admin/classes", params={"date": str(s["book"].date)}, headers=admin)
+    call("GET", "/admin/users", headers=admin)
+    call("GET", "/admin/users", params={"include": ["bookings", "subscriptions"]}, headers=admin)
+    call("GET", "/admin/users", params={"q": "Member 1"}, headers=admin)
+    call("GET", "/admin/bookings", headers=admin)
+    call("GET", f"/admin/bookings/{s['book'].id}", headers=admin)
+    call("GET", f"/admin/users/{user_id}/bookings", headers=admin)
+    call("GET", "/admin/template_classes", headers=admin)
+    call("GET", "/admin/subscriptions", headers=admin)
+    call("GET", "/admin/cache_stats", headers=admin)
+    call("GET", "/admin/password_pool_stats", headers=admin)
+    for kind in ("bookings", "users", "subscriptions"):
+        call("GET", f"/admin/export/{kind}", headers=admin)
+
+    admin_booking = None
+    if call("POST", "/admin/bookings", json={"class_id": str(s["admin_book"].id), "trainee_name": "Budget Member"}, headers=admin):
+        member_bookings = call("GET", f"/admin/users/{user_id}/bookings", headers=admin)
+        if member_bookings:
+            admin_booking = next((b for b in member_bookings.json() if b["class_"]["id"] == str(s["admin_book"].id)), None)
+        if admin_booking:
+            call("DELETE", f"/admin/bookings/{admin_booking['booking_id']}", headers=admin)
+        else:
+            failures.append("POST /admin/bookings: the booking is not listed for the member")
+
+    call("PUT", f"/admin/users/{user_id}", json={"name": "Budget Member", "phone": s["member"].phone, "city": "Athens", "gender": None}, headers=admin)
+    created = call("POST", f"/admin/subscriptions/{user_id}", json={
+        "subscription_model": SubscriptionModel.package_15.value,
+        "start_date": (today - timedelta(days=1)).isoformat(),
+        "end_date": (today + timedelta(days=30)).isoformat(),
+    }, headers=admin)
+    if created:
+        call("PUT", f"/admin/subscriptions/{created.json()['id']}", json={"package_total": 20}, headers=admin)
+        call("DELETE", f"/admin/subscriptions/{created.json()['id']}", headers=admin)
+
+    template = call("POST", "/admin/template_classes/", json={
+        "class_name": "Yoga", "weekday": 2, "time": "19:00", "max_participants": 8
+    }, headers=admin)
+    call("POST", "/admin/generate_schedule", params={
+        "start_date": str(today + timedelta(days=40)), "end_date": str(today + timedelta(days=46))
+    }, headers=admin)
+    if template:
+        call("DELETE", f"/admin/template_classes/{template.json()['id']}", headers=admin)
+    call("DELETE", f"/admin/classes/{s['empty'].id}", headers=admin)
+
+    new_user = call("POST", "/admin/users", json={"phone": f"69{uuid.uuid4().int % 10**8:08d}", "name": "Budget Temp"}, headers=admin)
+    if new_user:
+        call("DELETE", f"/admin/users/{new_user.json()['id']}", headers=admin)
+    return failures
+
+def undeclared_routes(app) -> list[str]:
+    return [
+        f"{','.join(sorted(route.methods))} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        and route.endpoint.__module__.startswith("routes.")
+        and query_budget.budget_of(route.endpoint) is None
+    ]
+
+def main():
+    engine = bench_engine()
+    # Before the app's engine exists, so it is created against the scratch database.
+    database.DATABASE_URL = engine.url.render_as_string(hide_password=False)
+    data = seed(engine)
+
+    from main import app
+
+    with TestClient(app) as client:
+        unexpected = drive(client, data)
+
+    failures = len(unexpected)
+    for problem in unexpected:
+        print(f"FAIL {problem}")
+    for route in undeclared_routes(app):
+        failures += 1
+        print(f"FAIL {route}: no query budget declared")
+
+    checked = set()
+    for m in query_budget.measurements:
+        if m.route == "unmatched":
+            continue
+        checked.add((m.method, m.route))
+        problems = m.violations
+        failures += len(problems)
+        for problem in problems:
+            print(f"FAIL {m.method} {m.route}: {problem}")
+        if not problems:
+            print(f"ok   {m.method} {m.route}: {m.statements}/{m.budget} statements")
+
+    print(f"{len(checked)} routes checked, {failures} violations.")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
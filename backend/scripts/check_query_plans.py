@@ -0,0 +1,138 @@
+"""Query plan regression check for the hot routes.
+
+Runs the real route handlers against a seeded database, captures every SELECT
+and UPDATE they issue, and EXPLAINs each one with enable_seqscan off. With
+sequential scans penalized, a Seq Scan on a large table in the plan means no
+index can serve that query, so the script reports it and exits with status 1.
+All writes happen inside transactions that are rolled back.
+
+    python -m scripts.check_query_plans
+"""
+import json
+import sys
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import event, select
+from zoneinfo import ZoneInfo
+
+from db.database import SessionLocal, engine
+from db.models import Booking, Class, User
+from db.schemas.booking import AdminBookingRequest, BookingCreate
+from db.schemas.user import LoginRequest
+from routes import admin_auth, classes, users
+from utils.bookings import book_class, cancel_member_booking
+from utils.cache import caches
+from utils.member_tokens import MemberIdentity
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+LARGE_TABLES = {"bookings", "classes", "subscriptions", "users"}
+
+def unconditional() -> Request:
+    """A request without If-None-Match, so conditional handlers run in full."""
+    return Request({"type": "http", "headers": []})
+
+def sample(db) -> dict:
+    today = datetime.now(GREECE_TZ).date()
+    upcoming = db.scalar(select(Class).where(Class.date > today + timedelta(days=1)).limit(1))
+    member_booking = db.scalar(select(Booking).join(Class).where(Class.date > today + timedelta(days=1)).limit(1))
+    if not upcoming or not member_booking:
+        sys.exit("The database needs upcoming classes and bookings; seed it first.")
+
+    member = db.get(User, member_booking.user_id)
+    return {"class": upcoming, "booking": member_booking, "user": member}
+
+def scenarios(s: dict) -> list:
+    user, class_obj, booking_obj = s["user"], s["class"], s["booking"]
+
+    # (name, handler, tables a full scan is accepted on)
+    return [
+        ("GET /classes", lambda db: classes.get_class(unconditional(), None, 14, None, 500), set()),
+        ("POST /login", lambda db: users.login(LoginRequest(phone=user.phone, password=user.password or 0), db), set()),
+        ("GET /users/{id}", lambda db: users.get_user(user.id, unconditional(), Response(), db), set()),
+        ("GET /users/{id}/bookings/history", lambda db: users.get_user_booking_history(user.id, Response(), None, 20, db, MemberIdentity(id=user.id)), set()),
+        ("POST /subscription", lambda db: users.get_user_subscription(user.id, db), set()),
+        ("POST /users/{id}/remaining_classes", lambda db: users.get_remaining_classes(user.id, db), set()),
+        ("POST /bookings", lambda db: book_class(db, user, BookingCreate(class_id=class_obj.id)), set()),
+        ("DELETE /bookings/{id}", lambda db: cancel_member_booking(db, user, booking_obj.id), set()),
+        ("GET /admin/classes", lambda db: admin_auth.get_classes_by_day(unconditional(), str(class_obj.date), None), set()),
+        ("GET /admin/bookings/{class_id}", lambda db: admin_auth.get_class_bookings(class_obj.id, db, None), set()),
+        ("GET /admin/users/{id}/bookings", lambda db: admin_auth.get_user_bookings(user.id, unconditional(), db, None), set()),
+        ("GET /admin/users", lambda db: admin_auth.get_users(
+            unconditional(), Response(), role=None, city=None, has_active_subscription=None, created_from=None, created_to=None,
+            q=None, include=["subscriptions"], cursor=None, limit=50, db=db, admin=None
+        ), set()),
+        ("GET /admin/users?q=", lambda db: admin_auth.get_users(
+            unconditional(), Response(), role=None, city=None, has_active_subscription=None, created_from=None, created_to=None,
+            q=user.name[:3], include=[], cursor=None, limit=50, db=db, admin=None
+        ), set()),
+        ("DELETE /admin/users/{id}", lambda db: admin_auth.delete_user(user.id, db, None), set()),
+        ("GET /subscriptions/{user_id}", lambda db: admin_auth.get_user_subscriptions(user.id, db, None), set()),
+        # Trainee lookup is a substring match on the name.
+        ("POST /admin/bookings", lambda db: admin_auth.admin_create_booking(
+            AdminBookingRequest(class_id=class_obj.id, trainee_name=user.name), db, None
+        ), {"users"}),
+    ]
+
+def capture_statements(fn) -> list:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    db = SessionLocal()
+    # Handlers that commit only flush here, so everything is rolled back below.
+    db.commit = db.flush
+    try:
+        fn(db)
+    except HTTPException:
+        pass
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        db.rollback()
+        db.close()
+    return statements
+
+def seq_scans(plan: dict) -> set:
+    found = set()
+    if plan.get("Node Type") == "Seq Scan":
+        found.add(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found |= seq_scans(child)
+    return found
+
+def explain(statement: str, parameters) -> dict:
+    with engine.connect() as conn:
+        cursor = conn.connection.cursor()
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        conn.rollback()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return plan[0]["Plan"]
+
+def main():
+    with SessionLocal() as db:
+        data = sample(db)
+
+    failures = 0
+    for name, handler, allowed in scenarios(data):
+        for cache in caches.values():
+            cache.clear()
+
+        for statement, parameters in capture_statements(handler):
+            scanned = (seq_scans(explain(statement, parameters)) & LARGE_TABLES) - allowed
+            if scanned:
+                failures += 1
+                print(f"FAIL {name}: sequential scan on {', '.join(sorted(scanned))}\n    {' '.join(statement.split())}")
+
+        print(f"checked {name}")
+
+    print(f"{failures} queries without an index path.")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+"""Deterministic synthetic data for local development, benchmarks and plan checks.
+
+Generates members with back-to-back subscriptions drawn from every
+SubscriptionModel, a weekly template schedule materialized into classes over
+the requested years of history (plus the upcoming days), and bookings that
+follow the studio's rules: one booking a day, the weekly limit of weekly
+subscriptions, the size of packages, Cadillac classes only on Cadillac
+subscriptions and never more participants than seats. Rows are bulk loaded
+with COPY in one transaction; class participant counts and package balances
+are then set from the loaded bookings.
+
+The same --seed and --today always produce the same rows. Into an empty
+database (or with --truncate, which empties the tables first):
+
+    python -m scripts.generate_data --members 2000 --years 1
+    python -m scripts.generate_data --members 100000 --years 3 --templates-per-day 48 --max-participants 40 --truncate
+
+The target is DB_URL unless --url is given.
+"""
+import argparse
+import csv
+import io
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import create_engine, text
+
+from db import database
+from db.models.subscription import PaymentStatus, SubscriptionModel
+from db.models.user import Gender, UserRole
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+CLASS_NAMES = ["Pilates Reformer", "Pilates Mat", "Cadillac Flow", "Yoga", "Pilates Tower"]
+SLOT_TIMES = [dt_time(h, m) for h in range(7, 22) for m in (0, 30)]
+CITIES = ["Αθήνα", "Πειραιάς", "Γλυφάδα", "Μαρούσι", "Κηφισιά", "Χαλάνδρι", "Νέα Σμύρνη", None]
+FIRST_NAMES = {
+    Gender.female: ["Μαρία", "Ελένη", "Κατερίνα", "Βασιλική", "Σοφία", "Αγγελική", "Δήμητρα", "Χριστίνα", "Ιωάννα", "Νίκη"],
+    Gender.male: ["Γιώργος", "Κώστας", "Νίκος", "Δημήτρης", "Γιάννης", "Παναγιώτης", "Βασίλης", "Χρήστος", "Αλέξανδρος", "Μιχάλης"],
+}
+LAST_NAMES = ["Παπαδοπούλου", "Κωνσταντίνου", "Γεωργίου", "Νικολάου", "Ιωάννου", "Δημητρίου", "Αθανασίου", "Οικονόμου", "Μακρή", "Βλάχου"]
+
+WEEKLY_LIMITS = {
+    SubscriptionModel.subscription_2: 2,
+    SubscriptionModel.subscription_3: 3,
+    SubscriptionModel.subscription_5: 5,
+    SubscriptionModel.family_2: 2,
+    SubscriptionModel.family_3: 3,
+    SubscriptionModel.family_3_cadillac: 3,
+    # Not limited by the booking rules; members still come a few times a week.
+    SubscriptionModel.free: 3,
+}
+PACKAGE_SIZES = {
+    SubscriptionModel.package_10: 10,
+    SubscriptionModel.package_15: 15,
+    SubscriptionModel.package_20: 20,
+    SubscriptionModel.cadillac_package_5: 5,
+    SubscriptionModel.cadillac_package_10: 10,
+    SubscriptionModel.yoga_4: 4,
+}
+PRICES = {
+    SubscriptionModel.subscription_2: 60.0,
+    SubscriptionModel.subscription_3: 80.0,
+    SubscriptionModel.subscription_5: 110.0,
+    SubscriptionModel.family_2: 100.0,
+    SubscriptionModel.family_3: 130.0,
+    SubscriptionModel.family_3_cadillac: 160.0,
+    SubscriptionModel.yoga_4: 40.0,
+    SubscriptionModel.package_10: 150.0,
+    SubscriptionModel.package_15: 210.0,
+    SubscriptionModel.package_20: 260.0,
+    SubscriptionModel.cadillac_package_5: 120.0,
+    SubscriptionModel.cadillac_package_10: 220.0,
+    SubscriptionModel.free: None,
+}
+# Relative frequency of each model when a member starts a subscription.
+DEFAULT_MIX = {
+    SubscriptionModel.subscription_2: 20,
+    SubscriptionModel.subscription_3: 15,
+    SubscriptionModel.subscription_5: 5,
+    SubscriptionModel.family_2: 4,
+    SubscriptionModel.family_3: 3,
+    SubscriptionModel.family_3_cadillac: 2,
+    SubscriptionModel.yoga_4: 4,
+    SubscriptionModel.package_10: 18,
+    SubscriptionModel.package_15: 8,
+    SubscriptionModel.package_20: 5,
+    SubscriptionModel.cadillac_package_5: 6,
+    SubscriptionModel.cadillac_package_10: 4,
+    SubscriptionModel.free: 1,
+}
+WEEKLY_PERIOD_DAYS = 30
+PACKAGE_PERIOD_DAYS = 60
+
+PACKAGE_MODELS = [m for m in SubscriptionModel if "package" in m.name]
+
+@dataclass
+class GeneratorConfig:
+    members: int = 1000
+    years: float = 1.0
+    upcoming_days: int = 14
+    # Weekly template slots per open day, and the open days (0 = Monday).
+    templates_per_day: int = 12
+    weekdays: int = 6
+    max_participants: int = 10
+    # Share of a subscription's allowance a member actually books.
+    booking_rate: float = 0.7
+    # Chance a member does not renew after each subscription.
+    churn: float = 0.15
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 1
+    today: date | None = None
+
+class CopyWriter:
+    """Streams rows into COPY ... FROM STDIN in chunks of about chunk_bytes."""
+
+    def __init__(self, cursor, table: str, columns: list[str], chunk_bytes: int = 8 << 20):
+        self.cursor = cursor
+        self.sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        self.chunk_bytes = chunk_bytes
+        self.rows = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self.rows += 1
+        if self._buffer.tell() >= self.chunk_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._buffer.tell():
+            self._buffer.seek(0)
+            self.cursor.copy_expert(self.sql, self._buffer)
+            self._buffer = io.StringIO()
+            self._writer = csv.writer(self._buffer)
+
+class Generator:
+    def __init__(self, config: GeneratorConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.today = config.today or datetime.now(GREECE_TZ).date()
+        self.first_day = self.today - timedelta(days=round(config.years * 365))
+        self.last_day = self.today + timedelta(days=config.upcoming_days)
+        self.models = list(config.mix)
+        self.weights = [config.mix[m] for m in self.models]
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def templates(self) -> list[tuple]:
+        """(id, class_name, weekday, time, max_participants, is_active) rows."""
+        per_day = self.config.templates_per_day
+        if per_day > len(SLOT_TIMES) * len(CLASS_NAMES):
+            raise SystemExit(f"At most {len(SLOT_TIMES) * len(CLASS_NAMES)} templates per day.")
+
+        rows = []
+        for weekday in range(self.config.weekdays):
+            for i in range(per_day):
+                slot = i % len(SLOT_TIMES)
+                # Slots sharing a time get different class names, as the unique slot constraint requires.
+                name = CLASS_NAMES[(i // len(SLOT_TIMES) + slot + weekday) % len(CLASS_NAMES)]
+                rows.append((self.uuid(), name, weekday, SLOT_TIMES[slot], self.config.max_participants, True))
+        return rows
+
+    def classes(self, templates: list[tuple]):
+        """Materializes the templates over every day; returns the rows and a per-day index."""
+        by_weekday = {}
+        for template in templates:
+            by_weekday.setdefault(template[2], []).append(template)
+
+        rows, by_day = [], {}
+        day = self.first_day
+        while day <= self.last_day:
+            regular, cadillac = [], []
+            for _, name, _, slot_time, max_participants, _ in by_weekday.get(day.weekday(), []):
+                (cadillac if "cadillac" in name.lower() else regular).append(len(rows))
+                rows.append((self.uuid(), name, day, slot_time, 0, max_participants))
+            if regular or cadillac:
+                by_day[day] = (regular, cadillac)
+            day += timedelta(days=1)
+        return rows, by_day
+
+    def members(self) -> list[tuple]:
+        """(id, phone, password, name, city, gender, created_at, role, has_accepted_terms) rows."""
+        span = (self.today - self.first_day).days
+        rows = []
+        for i in range(self.config.members):
+            gender = Gender.female if self.rng.random() < 0.8 else Gender.male
+            name = f"{self.rng.choice(FIRST_NAMES[gender])} {self.rng.choice(LAST_NAMES)}"
+            joined = datetime.combine(
+                self.first_day + timedelta(days=self.rng.randrange(span + 1)),
+                dt_time(self.rng.randrange(8, 21), self.rng.randrange(60)),
+                tzinfo=GREECE_TZ
+            )
+            rows.append((
+                self.uuid(), f"69{i:08d}", i + 1, name, self.rng.choice(CITIES), gender.name,
+                joined, UserRole.client.name, self.rng.random() < 0.9
+            ))
+        return rows
+
+    def subscriptions(self, members: list[tuple]) -> list[tuple]:
+        """Back-to-back subscriptions from each member's join date until they churn.
+
+        (id, user_id, model, start_date, end_date, package_total, price, payment_status, created_at)
+        """
+        rows = []
+        for member in members:
+            user_id, start = member[0], member[6]
+            while start.date() <= self.today:
+                model = self.rng.choices(self.models, self.weights)[0]
+                days = PACKAGE_PERIOD_DAYS if model in PACKAGE_SIZES else WEEKLY_PERIOD_DAYS
+                end = start + timedelta(days=days)
+                paid = end.date() < self.today or self.rng.random() < 0.8
+                rows.append((
+                    self.uuid(), user_id, model, start, end, PACKAGE_SIZES.get(model), PRICES[model],
+                    (PaymentStatus.paid if paid else PaymentStatus.pending).name, start
+                ))
+                if self.rng.random() < self.config.churn:
+                    break
+                # At least a day later, so no day belongs to two subscriptions (one booking a day).
+                start = end + timedelta(days=1 + self.rng.randrange(7))
+        return rows
+
+    def bookings(self, subscriptions: list[tuple], classes: list[tuple], by_day: dict):
+        """Yields (id, user_id, class_id, subscription_id, status, created_at) rows."""
+        seats = [0] * len(classes)
+        rate = self.config.booking_rate
+
+        def book(day: date, cadillac: bool) -> int | None:
+            options = by_day.get(day)
+            candidates = options[1 if cadillac else 0] if options else []
+            for _ in range(3):
+                if not candidates:
+                    return None
+                c = self.rng.choice(candidates)
+                if seats[c] < classes[c][5]:
+                    seats[c] += 1
+                    return c
+            return None
+
+        # Bookings per Monday-to-Sunday week of the current member, as
+        # validate_booking_rules counts them: every booking in the week counts,
+        # whichever of the member's back-to-back subscriptions made it.
+        member, week_counts = None, {}
+
+        for sub_id, user_id, model, start, end, package_total, *_ in subscriptions:
+            if user_id != member:
+                member, week_counts = user_id, {}
+            cadillac = "cadillac" in model.name
+            first = start.date()
+            last = min(end.date(), self.last_day)
+            if last < first:
+                continue
+
+            if model in PACKAGE_SIZES:
+                days = [first + timedelta(days=d) for d in range((last - first).days + 1)]
+                wanted = sum(self.rng.random() < rate for _ in range(package_total))
+                chosen = self.rng.sample(days, min(wanted, len(days)))
+            else:
+                limit = WEEKLY_LIMITS[model]
+                chosen, week = [], first - timedelta(days=first.weekday())
+                while week <= last:
+                    days = [week + timedelta(days=d) for d in range(7) if first <= week + timedelta(days=d) <= last]
+                    wanted = sum(self.rng.random() < rate for _ in range(limit))
+                    allowed = max(0, limit - week_counts.get(week, 0))
+                    chosen.extend(self.rng.sample(days, min(wanted, allowed, len(days))))
+                    week += timedelta(days=7)
+
+            paid_by = sub_id if model in PACKAGE_MODELS else None
+            for day in sorted(chosen):
+                c = book(day, cadillac)
+                if c is None:
+                    continue
+                monday = day - timedelta(days=day.weekday())
+                week_counts[monday] = week_counts.get(monday, 0) + 1
+                class_start = datetime.combine(day, classes[c][3], tzinfo=GREECE_TZ)
+                created_at = class_start - timedelta(hours=self.rng.uniform(2, 96))
+                yield (self.uuid(), user_id, classes[c][0], paid_by, "confirmed", created_at)
+
+def _timed(label: str, started: float, rows: int):
+    print(f"{label}: {rows} rows in {time.perf_counter() - started:.1f} s")
+
+def load(engine, config: GeneratorConfig, truncate: bool = False) -> dict:
+    generator = Generator(config)
+    counts = {}
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if truncate:
+            cursor.execute("TRUNCATE bookings, subscriptions, classes, template_classes, users, schedule_versions")
+        else:
+            cursor.execute("SELECT exists(SELECT 1 FROM users)")
+            if cursor.fetchone()[0]:
+                raise SystemExit("The users table is not empty; pass --truncate to replace its data.")
+
+        started = time.perf_counter()
+        templates = generator.templates()
+        writer = CopyWriter(cursor, "template_classes", ["id", "class_name", "weekday", "time", "max_participants", "is_active"])
+        for row in templates:
+            writer.write(row)
+        writer.flush()
+
+        classes, by_day = generator.classes(templates)
+        writer = CopyWriter(cursor, "classes", ["id", "class_name", "date", "time", "current_participants", "max_participants"])
+        for row in classes:
+            writer.write(row)
+        writer.flush()
+        counts["template_classes"], counts["classes"] = len(templates), len(classes)
+        _timed("classes", started, len(classes))
+
+        started = time.perf_counter()
+        members = generator.members()
+        writer = CopyWriter(cursor, "users", ["id", "phone", "password", "name", "city", "gender", "created_at", "role", "has_accepted_terms"])
+        for row in members:
+            writer.write(row)
+        writer.flush()
+        counts["users"] = len(members)
+        _timed("users", started, len(members))
+
+        started = time.perf_counter()
+        subscriptions = generator.subscriptions(members)
+        writer = CopyWriter(cursor, "subscriptions", [
+            "id", "user_id", "subscription_model", "start_date", "end_date",
+            "package_total", "price", "payment_status", "created_at"
+        ])
+        for sub_id, user_id, model, *rest in subscriptions:
+            writer.write((sub_id, user_id, model.name, *rest))
+        writer.flush()
+        counts["subscriptions"] = len(subscriptions)
+        _timed("subscriptions", started, len(subscriptions))
+
+        started = time.perf_counter()
+        writer = CopyWriter(cursor, "bookings", ["id", "user_id", "class_id", "subscription_id", "status", "created_at"])
+        for row in generator.bookings(subscriptions, classes, by_day):
+            writer.write(row)
+        writer.flush()
+        counts["bookings"] = writer.rows
+        _timed("bookings", started, writer.rows)
+
+        started = time.perf_counter()
+        cursor.execute("""
+            UPDATE classes SET current_participants = counted.seats
+            FROM (SELECT class_id, count(*) AS seats FROM bookings WHERE status = 'confirmed' GROUP BY class_id) AS counted
+            WHERE classes.id = counted.class_id
+        """)
+        cursor.execute("""
+            UPDATE subscriptions SET remaining_classes = subscriptions.package_total - coalesce(used.classes, 0)
+            FROM subscriptions AS s
+            LEFT JOIN (SELECT subscription_id, count(*) AS classes FROM bookings GROUP BY subscription_id) AS used
+                ON used.subscription_id = s.id
+            WHERE subscriptions.id = s.id AND s.subscription_model::text = ANY(%s)
+        """, ([m.name for m in PACKAGE_MODELS],))
+        raw.commit()
+        _timed("counters", started, counts["classes"])
+    finally:
+        raw.close()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+    return counts
+
+def parse_args() -> argparse.Namespace:
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=defaults.members)
+    parser.add_argument("--years", type=float, default=defaults.years, help="Years of history before --today")
+    parser.add_argument("--upcoming-days", type=int, default=defaults.upcoming_days)
+    parser.add_argument("--templates-per-day", type=int, default=defaults.templates_per_day)
+    parser.add_argument("--weekdays", type=int, default=defaults.weekdays, choices=range(1, 8), help="Open days, from Monday")
+    parser.add_argument("--max-participants", type=int, default=defaults.max_participants)
+    parser.add_argument("--booking-rate", type=float, default=defaults.booking_rate)
+    parser.add_argument("--churn", type=float, default=defaults.churn)
+    parser.add_argument(
+        "--mix", default=None,
+        help="Model weights as name=weight pairs, e.g. package_10=5,subscription_2=3; omitted models are not used"
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="Anchor date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--url", default=None, help="Database URL, defaults to DB_URL")
+    parser.add_argument("--truncate", action="store_true", help="Empty the tables first")
+    return parser.parse_args()
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            mix[SubscriptionModel[name.strip()]] = float(weight)
+        except (KeyError, ValueError):
+            raise SystemExit(f"Invalid mix entry: {part!r}")
+    return mix
+
+def main():
+    args = parse_args()
+    config = GeneratorConfig(
+        members=args.members,
+        years=args.years,
+        upcoming_days=args.upcoming_days,
+        templates_per_day=args.templates_per_day,
+        weekdays=args.weekdays,
+        max_participants=args.max_participants,
+        booking_rate=args.booking_rate,
+        churn=args.churn,
+        mix=parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX),
+        seed=args.seed,
+        today=args.today,
+    )
+    engine = create_engine(args.url) if args.url else database.get_engine()
+
+    started = time.perf_counter()
+    counts = load(engine, config, truncate=args.truncate)
+    print(f"Generated {counts} in {time.perf_counter() - started:.1f} s.")
+
+if __name__ == "__main__":
+    main()
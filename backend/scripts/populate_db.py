@@ -1,65 +1,334 @@
+"""Bulk import of members, and their current subscription, from a CSV export.
+
+Columns: name, phone, password, role, city, subscription_model,
+subscription_starts, subscription_expires, package_total, remaining_classes,
+plus an optional gender. Subscription models and roles may be given by name
+(package_10) or by label (πακέτο 10); dates are YYYY-MM-DD.
+
+Existing phones and passwords are read once up front. Rows are validated as
+the file streams; valid members and their Subscription rows are written with
+COPY in batches of --batch-size, one transaction per batch. Rows whose phone
+is already registered are skipped, invalid rows are reported, and neither
+stops the import. Members without a password get the next free one.
+
+A package balance is package_total minus the package's confirmed bookings,
+which an import has none of. A partly used package (remaining_classes below
+package_total) is therefore an error, unless --rebase-used-packages is given:
+then it is imported as a package of its remaining classes, with the original
+size kept in the subscription's note, so verify_credit_ledger agrees with it.
+
+Every row that was not imported is listed, with its line and the reason, in
+<file>.errors.csv. After each committed batch the last imported line is
+saved in <file>.checkpoint, so an interrupted import continues where it
+stopped with --resume; the checkpoint is removed once the file is done.
+
+    python -m scripts.populate_db members.csv --dry-run
+    python -m scripts.populate_db members.csv
+"""
+import argparse
 import csv
-from datetime import datetime
-from sqlalchemy.orm import Session
-from db.database import SessionLocal
-from db.models.user import User, UserRole
+import io
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time
+from zoneinfo import ZoneInfo
+
+from db import database
 from db.models.subscription import SubscriptionModel
+from db.models.user import Gender, UserRole
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+DEFAULT_BATCH_SIZE = 1000
+
+USER_COLUMNS = ["id", "phone", "password", "name", "city", "gender", "created_at", "role", "has_accepted_terms"]
+SUBSCRIPTION_COLUMNS = [
+    "id", "user_id", "subscription_model", "start_date", "end_date",
+    "package_total", "remaining_classes", "note", "created_at"
+]
+
+class RowError(ValueError):
+    pass
+
+class AlreadyRegistered(RowError):
+    pass
 
-def parse_date(value: str):
-    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+def parse_date(value: str) -> date | None:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+    except ValueError:
+        raise RowError(f"Invalid date: {value}")
 
-def parse_int(value: str):
-    return int(value) if value else None
+def parse_int(value: str) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        raise RowError(f"Invalid number: {value}")
 
 def parse_enum(enum_class, value: str):
+    """Accepts the member name or the value (label) of the enum."""
+    if not value:
+        return None
     try:
-        return enum_class[value] if value else None
+        return enum_class[value]
     except KeyError:
-        print(f"Invalid enum value for {enum_class.__name__}: {value}")
-        return None
+        pass
+    try:
+        return enum_class(value)
+    except ValueError:
+        raise RowError(f"Invalid {enum_class.__name__}: {value}")
+
+def parse_phone(value: str) -> str:
+    phone = value.replace(" ", "").replace("-", "")
+    if not phone.lstrip("+").isdigit():
+        raise RowError(f"Invalid phone: {value!r}")
+    return phone
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    subscriptions: int = 0
+    skipped: int = 0
+    errors: int = 0
+    resumed_after: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.imported + self.skipped + self.errors
+        return round(rows / self.seconds, 1) if self.seconds else 0.0
+
+class MemberValidator:
+    """Turns CSV rows into user and subscription rows, against the database and the rows before them."""
+
+    def __init__(self, phones: set[str], passwords: set[int], rebase_used_packages: bool = False):
+        self.phones = phones
+        self.passwords = passwords
+        self.rebase_used_packages = rebase_used_packages
+        # Phone -> line, for rows of this file.
+        self.seen = {}
+        self.next_password = max(passwords, default=0) + 1
+
+    def free_password(self) -> int:
+        while self.next_password in self.passwords:
+            self.next_password += 1
+        return self.next_password
 
+    def validate(self, row: dict, line: int, now: datetime) -> tuple[tuple, tuple | None]:
+        name = (row.get("name") or "").strip()
+        if not name:
+            raise RowError("Missing name")
+        phone = parse_phone((row.get("phone") or "").strip())
+        if phone in self.phones:
+            raise AlreadyRegistered("Phone already registered")
+        if phone in self.seen:
+            raise RowError(f"Duplicate phone, already on line {self.seen[phone]}")
 
-def import_users_from_csv(file_path: str):
-    added = 0
-    skipped = 0
+        password = parse_int((row.get("password") or "").strip())
+        if password is not None and password in self.passwords:
+            raise RowError(f"Password {password} is already in use")
 
-    with SessionLocal() as db:
-        print("Connected to:", db.bind.url)
+        role = parse_enum(UserRole, (row.get("role") or "").strip()) or UserRole.client
+        gender = parse_enum(Gender, (row.get("gender") or "").strip())
+        subscription = self.subscription(row)
 
-        with open(file_path, encoding="utf-8") as f:
+        user_id = uuid.uuid4()
+        password = password if password is not None else self.free_password()
+        self.passwords.add(password)
+        self.seen[phone] = line
+
+        user = (
+            user_id, phone, password, name, (row.get("city") or "").strip() or None,
+            gender.name if gender else None, now, role.name, False
+        )
+        if subscription is None:
+            return user, None
+        return user, (uuid.uuid4(), user_id, *subscription, now)
+
+    def subscription(self, row: dict) -> tuple | None:
+        model = parse_enum(SubscriptionModel, (row.get("subscription_model") or "").strip())
+        starts = parse_date((row.get("subscription_starts") or "").strip())
+        expires = parse_date((row.get("subscription_expires") or "").strip())
+        package_total = parse_int((row.get("package_total") or "").strip())
+        remaining = parse_int((row.get("remaining_classes") or "").strip())
+
+        if model is None:
+            if starts or expires or package_total is not None or remaining is not None:
+                raise RowError("Subscription details without a subscription_model")
+            return None
+        if not starts or not expires:
+            raise RowError("A subscription needs subscription_starts and subscription_expires")
+        if expires < starts:
+            raise RowError("subscription_expires is before subscription_starts")
+
+        note = None
+        if "package" in model.name:
+            if package_total is None or package_total <= 0:
+                raise RowError(f"{model.name} needs a positive package_total")
+            remaining = package_total if remaining is None else remaining
+            if not 0 <= remaining <= package_total:
+                raise RowError("remaining_classes must be between 0 and package_total")
+            if remaining < package_total:
+                if not self.rebase_used_packages:
+                    raise RowError(
+                        "Partly used package: the used classes have no bookings to back them; "
+                        "see --rebase-used-packages"
+                    )
+                note = f"Μεταφορά: απέμεναν {remaining} από {package_total} μαθήματα."
+                package_total = remaining
+
+        return (
+            model.name,
+            datetime.combine(starts, dt_time.min, tzinfo=GREECE_TZ),
+            datetime.combine(expires, dt_time.max, tzinfo=GREECE_TZ),
+            package_total,
+            remaining,
+            note,
+        )
+
+def _copy(cursor, table: str, columns: list[str], rows: list[tuple]):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def read_checkpoint(path: str) -> int:
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+def write_checkpoint(path: str, line: int):
+    with open(f"{path}.tmp", "w") as f:
+        f.write(str(line))
+    os.replace(f"{path}.tmp", path)
+
+def trim_report(path: str, last_line: int):
+    """Drops report rows after last_line: a resumed import validates those lines again."""
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(rows[:1] + [row for row in rows[1:] if int(row[0]) <= last_line])
+
+def import_members(
+    engine,
+    file_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+    resume: bool = False,
+    errors_path: str | None = None,
+    checkpoint_path: str | None = None,
+    rebase_used_packages: bool = False
+) -> ImportResult:
+    errors_path = errors_path or f"{file_path}.errors.csv"
+    checkpoint_path = checkpoint_path or f"{file_path}.checkpoint"
+    result = ImportResult(resumed_after=read_checkpoint(checkpoint_path) if resume else 0)
+    started = time.perf_counter()
+    now = datetime.now(GREECE_TZ)
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SELECT phone, password FROM users")
+        phones, passwords = set(), set()
+        for phone, password in cursor:
+            phones.add(phone)
+            if password is not None:
+                passwords.add(password)
+        raw.rollback()
+        validator = MemberValidator(phones, passwords, rebase_used_packages)
+
+        users, subscriptions, last_line = [], [], 0
+
+        def flush():
+            if users and not dry_run:
+                _copy(cursor, "users", USER_COLUMNS, users)
+                if subscriptions:
+                    _copy(cursor, "subscriptions", SUBSCRIPTION_COLUMNS, subscriptions)
+                raw.commit()
+                write_checkpoint(checkpoint_path, last_line)
+            result.imported += len(users)
+            result.subscriptions += len(subscriptions)
+            users.clear()
+            subscriptions.clear()
+
+        # A resumed import adds to the report of the run it continues, from its checkpoint on.
+        append = bool(result.resumed_after) and os.path.exists(errors_path)
+        if append:
+            trim_report(errors_path, result.resumed_after)
+        with open(file_path, encoding="utf-8-sig", newline="") as f, \
+                open(errors_path, "a" if append else "w", encoding="utf-8", newline="") as report:
+            errors = csv.writer(report)
+            if not append:
+                errors.writerow(["line", "phone", "name", "status", "reason"])
             reader = csv.DictReader(f)
 
             for row in reader:
-                if db.query(User).filter(User.phone == row["phone"]).first():
-                    print(f"Skipping duplicate phone: {row['phone']}")
-                    skipped += 1
+                line = reader.line_num
+                if line <= result.resumed_after:
                     continue
 
-                role = parse_enum(UserRole, row["role"])
-                subscription = parse_enum(SubscriptionModel, row["subscription_model"])
-                if not subscription and row["subscription_model"]:
-                    print(f"Skipping {row['name']} due to invalid subscription model: {row['subscription_model']}")
-                    skipped += 1
+                try:
+                    user, subscription = validator.validate(row, line, now)
+                except AlreadyRegistered as e:
+                    errors.writerow([line, row.get("phone"), row.get("name"), "skipped", str(e)])
+                    result.skipped += 1
                     continue
+                except RowError as e:
+                    errors.writerow([line, row.get("phone"), row.get("name"), "error", str(e)])
+                    result.errors += 1
+                    continue
+
+                users.append(user)
+                if subscription:
+                    subscriptions.append(subscription)
+                last_line = line
+                if len(users) >= batch_size:
+                    flush()
+            flush()
+    finally:
+        raw.close()
+
+    if not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    result.seconds = time.perf_counter() - started
+    return result
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", default="scripts/breathe_data.csv")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without writing")
+    parser.add_argument("--resume", action="store_true", help="Continue after the last committed batch")
+    parser.add_argument("--errors", default=None, help="Report path, defaults to <file>.errors.csv")
+    parser.add_argument(
+        "--rebase-used-packages", action="store_true",
+        help="Import partly used packages as packages of their remaining classes"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    engine = database.get_engine()
+    print("Connected to:", engine.url.render_as_string(hide_password=True))
 
-                user = User(
-                    name=row["name"],
-                    phone=row["phone"],
-                    password=parse_int(row["password"]),
-                    role=role,
-                    city=row["city"] or None,
-                    subscription_model=subscription,
-                    subscription_starts=parse_date(row["subscription_starts"]),
-                    subscription_expires=parse_date(row["subscription_expires"]),
-                    package_total=parse_int(row["package_total"]),
-                    remaining_classes=parse_int(row["remaining_classes"]),
-                )
-
-                db.add(user)
-                added += 1
-
-        db.commit()
-        print(f"Import complete! {added} added, {skipped} skipped.")
+    result = import_members(
+        engine, args.file, batch_size=args.batch_size, dry_run=args.dry_run,
+        resume=args.resume, errors_path=args.errors, rebase_used_packages=args.rebase_used_packages
+    )
+    action = "validated" if args.dry_run else "added"
+    print(
+        f"Import complete! {result.imported} {action} ({result.subscriptions} subscriptions), "
+        f"{result.skipped} skipped, {result.errors} errors in {result.seconds:.1f} s "
+        f"({result.rows_per_second} rows/s)."
+    )
+    if result.resumed_after:
+        print(f"Resumed after line {result.resumed_after}.")
+    if result.skipped or result.errors:
+        print(f"See {args.errors or args.file + '.errors.csv'} for the rows that were not imported.")
 
 if __name__ == "__main__":
-    import_users_from_csv("scripts/breathe_data.csv")
+    main()
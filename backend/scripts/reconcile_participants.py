@@ -0,0 +1,8 @@
+from db.database import SessionLocal
+from utils.occupancy import reconcile_participants
+
+with SessionLocal() as db:
+    fixed = reconcile_participants(db)
+    db.commit()
+
+print(f"Reconciled current_participants: {fixed} classes corrected.")
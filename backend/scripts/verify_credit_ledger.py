@@ -0,0 +1,30 @@
+import sys
+
+from db.database import SessionLocal
+from db.models.subscription import Subscription
+from utils.calc_class import recount_credits
+from utils.entitlements import bump_user_version
+
+fix = "--fix" in sys.argv
+
+with SessionLocal() as db:
+    mismatches = [row for row in recount_credits(db) if row["remaining_classes"] != row["expected_remaining"]]
+
+    for row in mismatches:
+        print(
+            f"Subscription {row['subscription_id']} (user {row['user_id']}): "
+            f"ledger {row['remaining_classes']}, recount {row['expected_remaining']}"
+        )
+
+    if fix and mismatches:
+        db.bulk_update_mappings(Subscription, [
+            {"id": row["subscription_id"], "remaining_classes": row["expected_remaining"]}
+            for row in mismatches
+        ])
+        # Cached entitlement snapshots are checked against the member's version.
+        for user_id in {row["user_id"] for row in mismatches}:
+            bump_user_version(db, user_id)
+        db.commit()
+
+print(f"{len(mismatches)} package balances differ from the recount." + (" Fixed." if fix and mismatches else ""))
+sys.exit(1 if mismatches and not fix else 0)
@@ -1,4 +1,4 @@
 from utils.db import get_db
 from utils.auth import verify_password, hash_password, create_access_token
-from utils.subscription import validate_booking_rules
+from utils.subscription import validate_booking_rules, lock_user_bookings
 from utils.calc_class import calculate_remaining_classes
\ No newline at end of file
@@ -1,8 +1,11 @@
+import hashlib
 import os
+import time
 import uuid
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from datetime import datetime, timezone, timedelta
@@ -11,6 +14,8 @@ from zoneinfo import ZoneInfo
 
 from utils import get_db
 from db.models.admin import Admin
+from utils.cache import LRUCache
+from utils.passwords import password_pool
 
 GREECE_TZ = ZoneInfo("Europe/Athens")
 
@@ -23,12 +28,37 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# Verified tokens map sha256(token) to the admin id and never outlive the
+# token's exp. Admin identities are cached as plain column values and dropped
+# by the ORM events below when an admin row is updated or deleted; the TTL
+# bounds staleness for changes made by other workers or outside the ORM.
+_verified_tokens = LRUCache(
+    "admin_tokens",
+    maxsize=int(os.getenv("ADMIN_TOKEN_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("ADMIN_TOKEN_CACHE_TTL", "300"))
+)
+_admins = LRUCache(
+    "admins",
+    maxsize=int(os.getenv("ADMIN_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("ADMIN_CACHE_TTL", "60"))
+)
+
+@event.listens_for(Admin, "after_update")
+@event.listens_for(Admin, "after_delete")
+def _invalidate_admin(mapper, connection, target):
+    _admins.invalidate(target.id)
+
 def verify_password(plain_pw, hashed_pw):
     return pwd_context.verify(plain_pw, hashed_pw)
 
 def hash_password(pw):
     return pwd_context.hash(pw)
 
+async def verify_and_update_password(plain_pw, hashed_pw) -> tuple[bool, str | None]:
+    """Verifies on the password pool; also returns a new hash when the stored
+    one uses outdated CryptContext settings, None otherwise."""
+    return await password_pool.run(pwd_context.verify_and_update, plain_pw, hashed_pw)
+
 def create_access_token(
     admin: Admin,
     expires_delta: timedelta = None
@@ -39,7 +69,6 @@ def create_access_token(
         "username": admin.username,
         "exp": expire
     }
-    print("Final token payload: ", payload)
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 def get_token_from_header_or_cookie(
@@ -54,14 +83,18 @@ def get_token_from_header_or_cookie(
         return token
     raise HTTPException(status_code=401, detail="Δεν βρήθεκε token.")
 
-def get_current_admin(
-    token: str = Depends(get_token_from_header_or_cookie),
-    db: Session = Depends(get_db)
-) -> Admin:
+def verify_token(token: str) -> uuid.UUID:
+    """Returns the admin id of a valid token, decoding it only on a cache miss."""
+    key = hashlib.sha256(token.encode()).digest()
+    admin_uuid = _verified_tokens.get(key)
+    if admin_uuid:
+        return admin_uuid
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         admin_id = payload.get("sub")
-        if not admin_id or admin_id == "None":
+        # Member tokens share the signing key but never grant admin access.
+        if not admin_id or admin_id == "None" or payload.get("typ") == "member":
             raise HTTPException(status_code=401, detail="Δεν επιτρέπεται η πρόσβαση.")
     
         admin_uuid = uuid.UUID(admin_id)
@@ -69,8 +102,28 @@ def get_current_admin(
     except JWTError:
         raise HTTPException(status_code=401, detail="Μη έγκυρο token.")
 
+    ttl = _verified_tokens.ttl
+    if payload.get("exp"):
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        _verified_tokens.set(key, admin_uuid, ttl=ttl)
+
+    return admin_uuid
+
+def get_current_admin(
+    token: str = Depends(get_token_from_header_or_cookie),
+    db: Session = Depends(get_db)
+) -> Admin:
+    admin_uuid = verify_token(token)
+
+    values = _admins.get(admin_uuid)
+    if values:
+        # A fresh transient instance per request; nothing is shared between sessions.
+        return Admin(**values)
+
     admin = db.query(Admin).filter(Admin.id == admin_uuid).first()
     if not admin:
         raise HTTPException(status_code=401, detail="Ο διαχειριστής δεν βρέθηκε.")
 
+    _admins.set(admin_uuid, {"id": admin.id, "username": admin.username, "email": admin.email})
     return admin
@@ -0,0 +1,161 @@
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from zoneinfo import ZoneInfo
+
+from db.models import booking, class_
+from db.models.user import User
+from utils.member_tokens import MemberIdentity
+from db.schemas.booking import BookingCreate
+from utils.subscription import validate_booking_rules, lock_user_bookings
+from utils.calc_class import refund_credit
+from utils.entitlements import bump_user_version
+from utils.versions import bump_date_versions
+from utils.metrics import Counter
+from utils.occupancy import reserve_seat, remove_participant
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+# The member booking flows, shared by the sync and async route handlers. Both
+# only stage their changes; the caller commits and then invalidates caches.
+
+# success is counted by the caller once the booking is committed.
+booking_outcomes = Counter(
+    "bookings_total",
+    "Member booking attempts by outcome: success, full or quota_rejected.",
+    labels=("outcome",)
+)
+
+def book_class(db: Session, current_user: MemberIdentity, booking_data: BookingCreate) -> booking.Booking:
+    # Seats, credits and the credit ledger only follow confirmed bookings; members make no others.
+    if booking_data.status != "confirmed":
+        raise HTTPException(status_code=400, detail="Μη έγκυρη κατάσταση κράτησης.")
+
+    user_id = current_user.id
+    version = lock_user_bookings(db, user_id)
+    if version is None:
+        # The token outlived the member's account.
+        raise HTTPException(status_code=401, detail="Ο χρήστης δεν βρέθηκε.")
+
+    existing = (
+        db.query(booking.Booking)
+        .filter(
+            booking.Booking.user_id == user_id,
+            booking.Booking.class_id == booking_data.class_id
+        )
+        .first()
+    )
+    if existing:
+        raise HTTPException(status_code=400, detail="Έχετε ήδη κάνει κράτηση σε αυτό το μάθημα.")
+
+    class_obj = db.query(class_.Class).filter_by(id=booking_data.class_id).first()
+    if not class_obj:
+        raise HTTPException(status_code=404, detail="Το μάθημα δεν βρέθηκε.")
+
+    class_datetime_str = f"{class_obj.date} {class_obj.time}"
+    class_datetime_str = class_datetime_str[:16]
+    class_datetime = datetime.strptime(class_datetime_str, "%Y-%m-%d %H:%M")
+
+    now = datetime.now(GREECE_TZ)
+    class_datetime = datetime.strptime(class_datetime_str, "%Y-%m-%d %H:%M").replace(tzinfo=GREECE_TZ)
+
+    if class_datetime - now < timedelta(hours=1.5):
+        raise HTTPException(status_code=400, detail="Η κράτηση πρέπει να γίνεται τουλάχιστον 1.5 ώρα πριν την έναρξη του μαθήματος.")
+
+    try:
+        paid_by = validate_booking_rules(db=db, current_user=current_user, class_obj=class_obj, version=version)
+    except HTTPException:
+        booking_outcomes.inc(outcome="quota_rejected")
+        raise
+
+    try:
+        reserve_seat(db, class_obj.id)
+    except HTTPException:
+        booking_outcomes.inc(outcome="full")
+        raise
+
+    new_booking = booking.Booking(
+        user_id = user_id,
+        class_id = booking_data.class_id,
+        subscription_id = paid_by.id if paid_by else None,
+        status = booking_data.status
+    )
+
+    new_booking.class_ = class_obj
+
+    db.add(new_booking)
+    bump_user_version(db, user_id)
+    bump_date_versions(db, class_obj.date)
+
+    return new_booking
+
+def cancel_member_booking(db: Session, current_user: MemberIdentity, booking_id: UUID) -> None:
+    booking_obj = db.query(booking.Booking).get(booking_id)
+    if not booking_obj:
+        raise HTTPException(status_code=404, detail="Η κράτηση δεν βρέθηκε.")
+    
+    if booking_obj.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Δεν έχετε δικαίωμα να ακυρώσετε αυτή την κράτηση.")
+
+    class_obj = db.query(class_.Class).get(booking_obj.class_id)
+    if not class_obj:
+        raise HTTPException(status_code=404, detail="Το μάθημα δεν βρέθηκε.")
+    
+    class_datetime_str = f"{class_obj.date} {class_obj.time}"
+    class_datetime_str = class_datetime_str[:16]
+    class_datetime = datetime.strptime(class_datetime_str, "%Y-%m-%d %H:%M")
+
+    now = datetime.now(GREECE_TZ)
+    class_datetime = datetime.strptime(class_datetime_str, "%Y-%m-%d %H:%M").replace(tzinfo=GREECE_TZ)
+
+    if class_datetime - now < timedelta(hours=2):
+        raise HTTPException(status_code=400, detail="Η ακύρωση πρέπει να γίνεται τουλάχιστον 2 ώρες πριν την έναρξη του μαθήματος.")
+
+    remove_participant(db, booking_obj)
+    refund_credit(db, booking_obj)
+    bump_user_version(db, current_user.id)
+    db.delete(booking_obj)
+    bump_date_versions(db, class_obj.date)
+
+def upcoming_bookings(today: date):
+    """Loader option that fills User.bookings with bookings from today on only.
+
+    Older bookings are served page by page by get_booking_history, so a
+    member's profile costs the same no matter how long they have trained.
+    """
+    upcoming_classes = select(class_.Class.id).where(class_.Class.date >= today)
+    return selectinload(
+        User.bookings.and_(booking.Booking.class_id.in_(upcoming_classes))
+    ).joinedload(booking.Booking.class_)
+
+def history_cursor_key(booking_obj: booking.Booking) -> tuple:
+    return booking_obj.class_.date, booking_obj.class_.time, booking_obj.id
+
+def get_booking_history(
+    db: Session,
+    user_id: UUID,
+    today: date,
+    after: tuple[date, time, UUID] | None = None,
+    limit: int = 20
+) -> list[booking.Booking]:
+    """Bookings of classes before today, newest first, plus one extra row to detect a next page."""
+    query = (
+        db.query(booking.Booking)
+        .join(booking.Booking.class_)
+        .options(contains_eager(booking.Booking.class_))
+        .filter(
+            booking.Booking.user_id == user_id,
+            class_.Class.date < today
+        )
+    )
+    if after:
+        query = query.filter(tuple_(class_.Class.date, class_.Class.time, booking.Booking.id) < after)
+
+    return (
+        query
+        .order_by(class_.Class.date.desc(), class_.Class.time.desc(), booking.Booking.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
@@ -1,49 +1,45 @@
+from datetime import timedelta
+from uuid import UUID
 from fastapi import HTTPException
+from sqlalchemy import and_, func, select, update
 from sqlalchemy.orm import Session
-from db.models.user import User
 from db.models.booking import Booking
 from db.models.class_ import Class
-from db.models.subscription import Subscription
+from db.models.subscription import Subscription, SubscriptionModel
+from utils.entitlements import get_entitlements
 
-def calculate_remaining_classes(user_id: str, db: Session) -> int:
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+# Package subscriptions carry a credit ledger: Subscription.remaining_classes is
+# the balance, debited in the transaction that books a class and credited back
+# in the one that cancels it. Booking.subscription_id records which package
+# paid for a booking, so a refund always goes to the right subscription.
+
+PACKAGE_MODELS = [m for m in SubscriptionModel if "package" in m.name]
+CADILLAC_PACKAGE_MODELS = [m for m in PACKAGE_MODELS if "cadillac" in m.name]
+REGULAR_PACKAGE_MODELS = [m for m in PACKAGE_MODELS if "cadillac" not in m.name]
+
+def is_package(model: SubscriptionModel) -> bool:
+    return model in PACKAGE_MODELS
+
+def _package_result(sub) -> dict:
+    remaining = sub.remaining_classes or 0
+    return {
+        "subscription_id": sub.id,
+        "subscription_model": sub.subscription_model.value,
+        "start_date": sub.start_date,
+        "end_date": sub.end_date,
+        "used_classes": max(0, (sub.package_total or 0) - remaining),
+        "remaining_classes": remaining
+    }
+
+def calculate_remaining_classes(user_id: UUID, db: Session) -> list[dict]:
+    entitlements = get_entitlements(db, user_id)
+    if not entitlements:
         raise HTTPException(status_code=404, detail="Ο χρήστης δεν βρέθηκε.")
 
-    results = []
-
-    for sub in user.subscriptions:
-        model = sub.subscription_model.name.lower()
-        if "package" in model:
-            
-            if "cadillac" in model:
-                class_filter = Class.class_name.ilike("%cadillac%")
-            else:
-                class_filter = ~Class.class_name.ilike("%cadillac%")
-            
-            booking_count = db.query(Booking).join(Class).filter(
-                Booking.user_id == user.id,
-                Booking.status == "confirmed",
-                Class.date >= sub.start_date,
-                Class.date <= sub.end_date,
-                class_filter
-            ).count()
-
-            remaining = max(0, sub.package_total - booking_count)
-
-            sub.remaining_classes = remaining
-
-            results.append({
-                "subscription_id": sub.id,
-                "subscription_model": sub.subscription_model.value,
-                "start_date": sub.start_date,
-                "end_date": sub.end_date,
-                "used_classes": booking_count,
-                "remaining_classes": remaining
-            })
-
-    db.commit()
-    return results
+    return [
+        _package_result(sub) for sub in entitlements.subscriptions
+        if is_package(sub.subscription_model)
+    ]
 
 def calculate_remaining_classes_for_subscription(user_id: str, subscription_id: str, db: Session) -> dict:
     sub = db.query(Subscription).filter(
@@ -54,8 +50,7 @@ def calculate_remaining_classes_for_subscription(user_id: str, subscription_id:
     if not sub:
         raise HTTPException(status_code=404, detail="Η συνδρομή δεν βρέθηκε για τον χρήστη.")
 
-    model = sub.subscription_model.name.lower()
-    if "package" not in model:
+    if not is_package(sub.subscription_model):
         return {
             "subscription_id": str(sub.id),
             "subscription_model": sub.subscription_model.value,
@@ -63,27 +58,80 @@ def calculate_remaining_classes_for_subscription(user_id: str, subscription_id:
             "message": "Η συνδρομή δεν είναι πακέτο με συγκεκριμένο αριθμό μαθημάτων."
         }
 
-    # Filter for Cadillac if needed
-    if "cadillac" in model:
-        class_filter = Class.class_name.ilike("%cadillac%")
-    else:
-        class_filter = ~Class.class_name.ilike("%cadillac%")
+    result = _package_result(sub)
+    result["subscription_id"] = str(sub.id)
+    return result
 
-    booking_count = db.query(Booking).join(Class).filter(
-        Booking.user_id == user_id,
-        Booking.status == "confirmed",
-        Class.date >= sub.start_date,
-        Class.date <= sub.end_date,
-        class_filter
-    ).count()
+def find_package_credit(db: Session, user_id, class_obj: Class, for_update: bool = False) -> Subscription | None:
+    """The active package with credits left that can pay for class_obj.
 
-    remaining = max(0, sub.package_total - booking_count)
+    Cadillac classes are only paid by Cadillac packages and vice versa. When
+    several packages qualify, the one that expires first is used.
+    """
+    is_cadillac_class = "cadillac" in class_obj.class_name.lower()
+    models = CADILLAC_PACKAGE_MODELS if is_cadillac_class else REGULAR_PACKAGE_MODELS
 
-    return {
-        "subscription_id": str(sub.id),
-        "subscription_model": sub.subscription_model.value,
-        "start_date": sub.start_date,
-        "end_date": sub.end_date,
-        "used_classes": booking_count,
-        "remaining_classes": remaining
-    }
+    query = (
+        db.query(Subscription)
+        .filter(
+            Subscription.user_id == user_id,
+            Subscription.subscription_model.in_(models),
+            Subscription.start_date < class_obj.date + timedelta(days=1),
+            Subscription.end_date >= class_obj.date,
+            Subscription.remaining_classes > 0
+        )
+        .order_by(Subscription.end_date, Subscription.id)
+    )
+    if for_update:
+        query = query.with_for_update()
+
+    return query.first()
+
+def debit_credit(db: Session, user_id, class_obj: Class) -> Subscription | None:
+    """Takes one credit for class_obj and returns the package that paid, if any."""
+    sub = find_package_credit(db, user_id, class_obj, for_update=True)
+    if sub:
+        sub.remaining_classes -= 1
+    return sub
+
+def refund_credit(db: Session, booking_obj: Booking) -> None:
+    if not booking_obj.subscription_id or booking_obj.status != "confirmed":
+        return
+
+    db.execute(
+        update(Subscription)
+        .where(Subscription.id == booking_obj.subscription_id)
+        .values(remaining_classes=func.least(Subscription.remaining_classes + 1, Subscription.package_total))
+        .execution_options(synchronize_session=False)
+    )
+
+def recount_credits(db: Session) -> list[dict]:
+    """Recomputes every package balance from its confirmed bookings.
+
+    Returns one row per package subscription with the stored balance next to
+    the recounted one.
+    """
+    used = func.count(Booking.id)
+    rows = db.execute(
+        select(
+            Subscription.id,
+            Subscription.user_id,
+            Subscription.package_total,
+            Subscription.remaining_classes,
+            used.label("used")
+        )
+        .outerjoin(Booking, and_(Booking.subscription_id == Subscription.id, Booking.status == "confirmed"))
+        .where(Subscription.subscription_model.in_(PACKAGE_MODELS))
+        .group_by(Subscription.id)
+    ).all()
+
+    return [
+        {
+            "subscription_id": row.id,
+            "user_id": row.user_id,
+            "package_total": row.package_total,
+            "remaining_classes": row.remaining_classes,
+            "expected_remaining": max(0, (row.package_total or 0) - row.used),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,37 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from fastapi import Request, Response
+
+# Days before today are closed, so their reads may be cached by the client for
+# a week; everything else must be revalidated, which costs a 304 when nothing
+# changed.
+PAST_DATES_MAX_AGE = 7 * 24 * 3600
+
+def make_etag(*parts) -> str:
+    return 'W/"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+def cache_control(past: bool = False, private: bool = False) -> str:
+    scope = "private" if private else "public"
+    return f"{scope}, max-age={PAST_DATES_MAX_AGE}" if past else f"{scope}, no-cache"
+
+def set_validators(response: Response, etag: str, last_modified: datetime | None = None, cache: str = "public, no-cache"):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache
+    if last_modified:
+        response.headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match check with weak comparison, as RFC 9110 requires for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+def not_modified(response: Response) -> Response:
+    """A 304 carrying the validators already set on response."""
+    return Response(status_code=304, headers=dict(response.headers))
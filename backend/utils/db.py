@@ -1,9 +1,11 @@
-from uuid import UUID
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from db import database
 from db.database import SessionLocal
-from db.models.user import User
+from utils.member_tokens import MemberIdentity, decode_member_token
+
+member_bearer = HTTPBearer(auto_error=False)
 
 def get_db():
     db = SessionLocal()
@@ -12,9 +14,15 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(user_id: UUID, db: Session = Depends(get_db)) -> User:
-    user = db.query(User).get(user_id)
-    if not user:
-        raise HTTPException(status_code=401, detail="Invalid user ID")
-    
-    return user
\ No newline at end of file
+async def get_async_db():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+async def get_current_user(
+    authorization: HTTPAuthorizationCredentials = Depends(member_bearer)
+) -> MemberIdentity:
+    """Verifies the member token issued by /login; no database access."""
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Δεν βρήθεκε token.")
+
+    return decode_member_token(authorization.credentials)
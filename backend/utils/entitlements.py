@@ -0,0 +1,107 @@
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from uuid import UUID
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from zoneinfo import ZoneInfo
+
+from db.models.booking import Booking
+from db.models.class_ import Class
+from db.models.subscription import Subscription
+from db.models.user import User
+from db.schemas.subscription import SubscriptionOut
+from utils.cache import LRUCache
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+# Each entry is stamped with User.version, which is bumped in every transaction
+# that changes a member's bookings or subscriptions. A snapshot is only served
+# while its version matches the database, so it stays correct even when another
+# worker process made the change. Local invalidation just frees the slot early.
+_snapshots = LRUCache(
+    "entitlements",
+    maxsize=int(os.getenv("ENTITLEMENT_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("ENTITLEMENT_CACHE_TTL", "300"))
+)
+
+@dataclass(frozen=True)
+class EntitlementSnapshot:
+    user_id: UUID
+    version: int
+    subscriptions: list[SubscriptionOut]
+    # Bookings per class date, from the Monday of the week the snapshot was taken.
+    booking_days: Counter = field(default_factory=Counter)
+
+    def subscriptions_covering(self, day: date) -> list[SubscriptionOut]:
+        covering = [
+            sub for sub in self.subscriptions
+            if sub.start_date.date() <= day <= sub.end_date.date()
+        ]
+        return sorted(covering, key=lambda sub: sub.start_date, reverse=True)
+
+    def active_subscriptions(self, now: datetime) -> list[SubscriptionOut]:
+        return [sub for sub in self.subscriptions if sub.start_date <= now <= sub.end_date]
+
+    def bookings_on(self, day: date) -> int:
+        return self.booking_days.get(day, 0)
+
+    def bookings_in_week(self, day: date) -> int:
+        start_of_week = day - timedelta(days=day.weekday())
+        return sum(self.bookings_on(start_of_week + timedelta(days=i)) for i in range(7))
+
+def bump_user_version(db: Session, user_id: UUID) -> None:
+    """Marks cached entitlements of a member stale; call it in the writing transaction."""
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(version=User.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def invalidate_entitlements(user_id: UUID) -> None:
+    _snapshots.invalidate(user_id)
+
+def _load_snapshot(db: Session, user_id: UUID, version: int) -> EntitlementSnapshot:
+    subscriptions = (
+        db.query(Subscription)
+        .filter(Subscription.user_id == user_id)
+        .order_by(Subscription.start_date)
+        .all()
+    )
+
+    today = datetime.now(GREECE_TZ).date()
+    start_of_week = today - timedelta(days=today.weekday())
+    booking_days = db.execute(
+        select(Class.date, func.count(Booking.id))
+        .join(Booking, Booking.class_id == Class.id)
+        .where(Booking.user_id == user_id, Class.date >= start_of_week)
+        .group_by(Class.date)
+    ).all()
+
+    return EntitlementSnapshot(
+        user_id=user_id,
+        version=version,
+        subscriptions=[SubscriptionOut.model_validate(sub) for sub in subscriptions],
+        booking_days=Counter(dict(booking_days))
+    )
+
+def get_entitlements(db: Session, user_id: UUID, version: int | None = None) -> EntitlementSnapshot | None:
+    """The member's entitlement snapshot, or None if the user does not exist.
+
+    Pass the version when the caller already read it (e.g. while locking the
+    user row) to skip the version lookup.
+    """
+    if version is None:
+        version = db.scalar(select(User.version).where(User.id == user_id))
+        if version is None:
+            return None
+
+    snapshot = _snapshots.get(user_id, valid=lambda cached: cached.version == version)
+    if snapshot is not None:
+        return snapshot
+
+    snapshot = _load_snapshot(db, user_id, version)
+    _snapshots.set(user_id, snapshot)
+    return snapshot
@@ -0,0 +1,129 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Iterator
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from db import database
+from db.models.booking import Booking
+from db.models.class_ import Class
+from db.models.subscription import Subscription
+from db.models.user import User
+from utils.members import filter_members
+
+# Exports read through a server-side cursor and encode one batch at a time, so
+# memory depends on EXPORT_BATCH_SIZE and not on the size of the table.
+
+EXPORT_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+def bookings_export_query(start_date: date | None = None, end_date: date | None = None) -> Select:
+    stmt = (
+        select(
+            Booking.id.label("booking_id"),
+            Booking.status,
+            Booking.created_at,
+            User.id.label("user_id"),
+            User.name.label("user_name"),
+            User.phone,
+            Class.id.label("class_id"),
+            Class.class_name,
+            Class.date,
+            Class.time
+        )
+        .join(User, Booking.user_id == User.id)
+        .join(Class, Booking.class_id == Class.id)
+        .order_by(Class.date, Class.time, Booking.id)
+    )
+    if start_date:
+        stmt = stmt.where(Class.date >= start_date)
+    if end_date:
+        stmt = stmt.where(Class.date <= end_date)
+    return stmt
+
+def users_export_query(**filters) -> Select:
+    stmt = select(
+        User.id,
+        User.name,
+        User.phone,
+        User.city,
+        User.gender,
+        User.role,
+        User.created_at,
+        User.has_accepted_terms
+    ).order_by(User.created_at, User.id)
+    return filter_members(stmt, **filters)
+
+def subscriptions_export_query(start_date: date | None = None, end_date: date | None = None) -> Select:
+    """Subscriptions that overlap [start_date, end_date]."""
+    stmt = (
+        select(
+            Subscription.id.label("subscription_id"),
+            User.id.label("user_id"),
+            User.name.label("user_name"),
+            User.phone,
+            Subscription.subscription_model,
+            Subscription.start_date,
+            Subscription.end_date,
+            Subscription.package_total,
+            Subscription.remaining_classes,
+            Subscription.price,
+            Subscription.payment_status,
+            Subscription.created_at
+        )
+        .join(User, Subscription.user_id == User.id)
+        .order_by(Subscription.start_date, Subscription.id)
+    )
+    if start_date:
+        stmt = stmt.where(Subscription.end_date >= start_date)
+    if end_date:
+        stmt = stmt.where(Subscription.start_date < end_date + timedelta(days=1))
+    return stmt
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_plain(v) for v in row] for row in rows)
+    return buffer.getvalue().encode()
+
+def _ndjson_chunk(columns: list[str], rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+def stream_export(stmt: Select, fmt: str, session_factory=None, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Yields stmt's rows as CSV or NDJSON, one encoded batch per chunk.
+
+    The generator owns its session: a StreamingResponse keeps iterating after
+    the request's dependencies have been closed.
+    """
+    session_factory = session_factory or database.SessionLocal
+    with session_factory() as db:
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        columns = list(result.keys())
+
+        if fmt == "csv":
+            # BOM so Excel opens the Greek names as UTF-8.
+            yield "\ufeff".encode() + _csv_chunk([columns])
+
+        for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(columns, rows)
@@ -0,0 +1,52 @@
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from zoneinfo import ZoneInfo
+
+from db.models.user import User, UserRole
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+load_dotenv(override=True)
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = os.getenv("ALGORITHM")
+MEMBER_TOKEN_EXPIRE_MINUTES = int(os.getenv("MEMBER_TOKEN_EXPIRE_MINUTES", "720"))
+
+# Distinguishes member tokens from admin tokens signed with the same key.
+MEMBER_TOKEN_TYPE = "member"
+
+@dataclass(frozen=True)
+class MemberIdentity:
+    """The member a request acts for, taken from a verified token.
+
+    Carries what the booking flows need without a database round trip.
+    """
+    id: uuid.UUID
+    role: UserRole | None = None
+
+def create_member_token(user: User, expires_delta: timedelta = None) -> str:
+    expire = datetime.now(GREECE_TZ) + (expires_delta or timedelta(minutes=MEMBER_TOKEN_EXPIRE_MINUTES))
+    payload = {
+        "sub": str(user.id),
+        "role": user.role.value if user.role else None,
+        "typ": MEMBER_TOKEN_TYPE,
+        "exp": expire
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_member_token(token: str) -> MemberIdentity:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload.get("typ") != MEMBER_TOKEN_TYPE:
+            raise HTTPException(status_code=401, detail="Μη έγκυρο token.")
+
+        role = payload.get("role")
+        return MemberIdentity(id=uuid.UUID(payload["sub"]), role=UserRole(role) if role else None)
+
+    except (JWTError, KeyError, ValueError):
+        raise HTTPException(status_code=401, detail="Μη έγκυρο token.")
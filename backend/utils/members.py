@@ -0,0 +1,88 @@
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import and_, exists, func, or_, tuple_
+from sqlalchemy.orm import Session, selectinload
+from zoneinfo import ZoneInfo
+
+from db.models.booking import Booking
+from db.models.subscription import Subscription
+from db.models.user import User, UserRole
+from utils.pagination import decode_cursor
+
+GREECE_TZ = ZoneInfo("Europe/Athens")
+
+def decode_member_cursor(cursor: str | None) -> tuple[datetime, UUID] | None:
+    if not cursor:
+        return None
+
+    cursor_created_at, cursor_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(cursor_created_at), UUID(cursor_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Μη έγκυρος δείκτης σελίδας.")
+
+def member_cursor_key(user_obj: User) -> tuple:
+    return user_obj.created_at.isoformat(), user_obj.id
+
+def filter_members(
+    query,
+    role: UserRole | None = None,
+    city: str | None = None,
+    has_active_subscription: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    search: str | None = None
+):
+    """Applies the admin member filters to a query over User."""
+    if role:
+        query = query.filter(User.role == role)
+    if city:
+        query = query.filter(func.lower(User.city) == city.lower())
+    if created_from:
+        query = query.filter(User.created_at >= created_from)
+    if created_to:
+        query = query.filter(User.created_at < created_to)
+    if search:
+        # Prefix matches only, so the text_pattern_ops indexes can serve them.
+        query = query.filter(or_(
+            func.lower(User.name).startswith(search.lower(), autoescape=True),
+            User.phone.startswith(search, autoescape=True)
+        ))
+    if has_active_subscription is not None:
+        now = datetime.now(GREECE_TZ)
+        active = exists().where(and_(
+            Subscription.user_id == User.id,
+            Subscription.start_date <= now,
+            Subscription.end_date >= now
+        ))
+        query = query.filter(active if has_active_subscription else ~active)
+    return query
+
+def list_members(
+    db: Session,
+    after: tuple[datetime, UUID] | None = None,
+    limit: int = 50,
+    include: set[str] = frozenset(),
+    **filters
+) -> list[User]:
+    """One page of members, newest first, plus one extra row to detect a next page.
+
+    Bookings and subscriptions are only loaded when listed in include, each
+    with a single extra query for the whole page.
+    """
+    query = filter_members(db.query(User), **filters)
+
+    if after:
+        query = query.filter(tuple_(User.created_at, User.id) < after)
+    if "subscriptions" in include:
+        query = query.options(selectinload(User.subscriptions))
+    if "bookings" in include:
+        query = query.options(selectinload(User.bookings).joinedload(Booking.class_))
+
+    return (
+        query
+        .order_by(User.created_at.desc(), User.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
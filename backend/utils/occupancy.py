@@ -0,0 +1,86 @@
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from db.models.booking import Booking
+from db.models.class_ import Class
+
+# Class.current_participants counts confirmed bookings. Every statement that
+# inserts or deletes a booking must adjust it in the same transaction, so the
+# helpers below only execute UPDATEs and leave the commit to the caller.
+
+def reserve_seat(db: Session, class_id: UUID) -> int:
+    """Takes one seat with a single conditional UPDATE.
+
+    The row lock taken by the UPDATE serializes concurrent bookings of the same
+    class, and the WHERE clause is re-evaluated against the latest committed
+    counter, so a burst of requests can never push a class past
+    max_participants. Returns the new participant count.
+    """
+    seats = db.execute(
+        update(Class)
+        .where(
+            Class.id == class_id,
+            Class.current_participants < Class.max_participants
+        )
+        .values(current_participants=Class.current_participants + 1)
+        .returning(Class.current_participants)
+    ).scalar_one_or_none()
+
+    if seats is None:
+        raise HTTPException(status_code=409, detail="Το μάθημα είναι πλήρες.")
+
+    return seats
+
+def remove_participant(db: Session, booking_obj: Booking) -> None:
+    if booking_obj.status != "confirmed":
+        return
+
+    db.execute(
+        update(Class)
+        .where(Class.id == booking_obj.class_id)
+        .values(current_participants=func.greatest(Class.current_participants - 1, 0))
+        .execution_options(synchronize_session=False)
+    )
+
+def remove_user_participants(db: Session, user_id: UUID) -> None:
+    """Releases the seats of every confirmed booking of a user with one UPDATE."""
+    counts = (
+        select(Booking.class_id, func.count(Booking.id).label("seats"))
+        .where(Booking.user_id == user_id, Booking.status == "confirmed")
+        .group_by(Booking.class_id)
+        .subquery()
+    )
+
+    db.execute(
+        update(Class)
+        .where(Class.id == counts.c.class_id)
+        .values(current_participants=func.greatest(Class.current_participants - counts.c.seats, 0))
+        .execution_options(synchronize_session=False)
+    )
+
+def reconcile_participants(db: Session) -> int:
+    """Rewrites every drifted counter from a full recount, in one set-based UPDATE.
+
+    Returns the number of classes that were corrected.
+    """
+    counted = aliased(Class)
+    counts = (
+        select(counted.id.label("class_id"), func.count(Booking.id).label("seats"))
+        .select_from(counted)
+        .outerjoin(Booking, and_(Booking.class_id == counted.id, Booking.status == "confirmed"))
+        .group_by(counted.id)
+        .subquery()
+    )
+
+    result = db.execute(
+        update(Class)
+        .where(
+            Class.id == counts.c.class_id,
+            Class.current_participants.is_distinct_from(counts.c.seats)
+        )
+        .values(current_participants=counts.c.seats)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
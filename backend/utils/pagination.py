@@ -0,0 +1,34 @@
+import base64
+import json
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values) -> str:
+    """Packs the sort key of the last row of a page into an opaque cursor."""
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Μη έγκυρος δείκτης σελίδας.")
+
+    # encode_cursor only writes strings; anything else was not made by us.
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise HTTPException(status_code=400, detail="Μη έγκυρος δείκτης σελίδας.")
+
+    return values
+
+def set_next_cursor(response: Response, rows: list, limit: int, key) -> list:
+    """Trims a page fetched with limit + 1 rows and advertises the next cursor.
+
+    The cursor travels in a response header so list endpoints keep returning a
+    plain JSON array.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+
+# bcrypt is deliberately slow and CPU-bound. Running it on the shared Starlette
+# threadpool lets a burst of logins starve every other sync handler, so hashing
+# gets its own small pool; bcrypt releases the GIL while it works. Requests
+# beyond PASSWORD_QUEUE_LIMIT waiting in line are turned away with a 503.
+# A job leaves the queue either when a worker picks it up or when its caller
+# is cancelled (say the client disconnected) before that, whichever is first.
+
+class PasswordPool:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.started = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _dequeue(self, job: dict) -> bool:
+        """Takes a job off the queue count once; False if it already left."""
+        with self._lock:
+            if job["dequeued"]:
+                return False
+            job["dequeued"] = True
+            self.queued -= 1
+            return True
+
+    def _task(self, job: dict, submitted: float, fn, args):
+        if not self._dequeue(job):
+            # The caller was cancelled while the job waited; nobody wants the result.
+            return None
+
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            self.started += 1
+            self.running += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Ο διακομιστής είναι απασχολημένος, δοκιμάστε ξανά.")
+            self.queued += 1
+
+        job = {"dequeued": False}
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._task, job, time.perf_counter(), fn, args)
+        finally:
+            self._dequeue(job)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "mean_wait_ms": round(self.wait_total / self.started * 1000, 3) if self.started else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+            }
+
+password_pool = PasswordPool(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+    max_queue=int(os.getenv("PASSWORD_QUEUE_LIMIT", "64"))
+)
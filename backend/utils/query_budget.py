@@ -0,0 +1,82 @@
+import logging
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Every route declares the most SQL statements one request may run, counting
+# its dependencies and with cold caches. Checking is off in production; with
+# QUERY_BUDGET_CHECK=true the metrics middleware also records the shape of
+# every statement and checks each request against its route's budget, and any
+# statement shape run more than the route's `repeats` times in one request is
+# reported as a likely N+1. scripts/check_query_budgets.py drives every route
+# through the app on a seeded database and fails on violations.
+
+QUERY_BUDGET_CHECK = os.getenv("QUERY_BUDGET_CHECK", "false").lower() == "true"
+
+# Identical statements allowed per request before it counts as an N+1.
+DEFAULT_REPEATS = 2
+
+logger = logging.getLogger(__name__)
+
+def query_budget(statements: int, repeats: int = DEFAULT_REPEATS):
+    """Declares a route's statement budget; put it under the router decorator."""
+    def decorate(endpoint):
+        endpoint.query_budget = (statements, repeats)
+        return endpoint
+    return decorate
+
+def budget_of(endpoint) -> tuple[int, int] | None:
+    return getattr(endpoint, "query_budget", None)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and multi-row VALUES differ in length between calls of
+# the same code path; collapse them so they share a shape.
+_PARAM_LIST = re.compile(r"\((?:\s*%\([^)]+\)s\s*,?)+\)")
+_NUMBERED = re.compile(r"%\((\w+?)_\d+(?:_\d+)?\)s")
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _NUMBERED.sub(r"%(\1)s", shape)
+    return _PARAM_LIST.sub("(...)", shape)
+
+@dataclass
+class Measurement:
+    method: str
+    route: str
+    statements: int
+    budget: int | None
+    repeated: dict = field(default_factory=dict)
+
+    @property
+    def violations(self) -> list[str]:
+        problems = []
+        if self.budget is None:
+            problems.append("no query budget declared")
+        elif self.statements > self.budget:
+            problems.append(f"{self.statements} statements, budget is {self.budget}")
+        for shape, count in self.repeated.items():
+            problems.append(f"statement repeated {count} times (N+1?): {shape[:200]}")
+        return problems
+
+# Every checked request, in order; read by scripts/check_query_budgets.py.
+measurements: list[Measurement] = []
+
+def check_request(method: str, route, shapes: Counter) -> Measurement:
+    budget = budget_of(getattr(route, "endpoint", None)) if route else None
+    statements, repeats = budget if budget else (None, DEFAULT_REPEATS)
+
+    measurement = Measurement(
+        method=method,
+        route=getattr(route, "path", "unmatched"),
+        statements=sum(shapes.values()),
+        budget=statements,
+        repeated={shape: count for shape, count in shapes.items() if count > repeats}
+    )
+    measurements.append(measurement)
+
+    # Unmatched paths (404s) have no route and hence no budget to break.
+    if route:
+        for problem in measurement.violations:
+            logger.warning("%s %s: %s", method, measurement.route, problem)
+    return measurement
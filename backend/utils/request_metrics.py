@@ -0,0 +1,119 @@
+import time
+from collections import Counter as ShapeCounter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metrics import Counter, Histogram
+from utils.query_budget import QUERY_BUDGET_CHECK, check_request, statement_shape
+
+# Per-route latency plus the SQL each request ran and the time it waited for a
+# pool connection. The middleware opens a RequestStats for every request; the
+# engine events and the pool add to whichever one is current. Sync handlers
+# run in a copy of the request's context, so they add to the same object.
+
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template.",
+    labels=("method", "route", "status")
+)
+request_statements = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request.",
+    labels=("method", "route"),
+    buckets=STATEMENT_BUCKETS
+)
+request_sql_time = Histogram(
+    "http_request_sql_seconds",
+    "Time spent executing SQL per request.",
+    labels=("method", "route")
+)
+request_pool_wait = Histogram(
+    "http_request_pool_wait_seconds",
+    "Time spent waiting for pool connections per request.",
+    labels=("method", "route")
+)
+statements_total = Counter(
+    "db_statements_total",
+    "SQL statements executed, in or outside requests."
+)
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    sql_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    # Statement shape -> count; only kept when QUERY_BUDGET_CHECK is on.
+    shapes: ShapeCounter | None = None
+
+current_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    statements_total.inc()
+
+    stats = current_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+        if stats.shapes is not None:
+            stats.shapes[statement_shape(statement)] += 1
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute does not fire for a failed statement; drop its start
+    # time here, or it stays on the pooled connection's info for good.
+    conn = context.connection
+    if conn is not None and context.cursor is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+def record_pool_wait(seconds: float) -> None:
+    stats = current_stats.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; it does not buffer or wrap the response body."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(shapes=ShapeCounter() if QUERY_BUDGET_CHECK else None)
+        token = current_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
+            method, route = scope["method"], _route_label(scope)
+            request_duration.observe(time.perf_counter() - started, method=method, route=route, status=status)
+            request_statements.observe(stats.statements, method=method, route=route)
+            request_sql_time.observe(stats.sql_seconds, method=method, route=route)
+            request_pool_wait.observe(stats.pool_wait_seconds, method=method, route=route)
+            if stats.shapes is not None:
+                check_request(method, scope.get("route"), stats.shapes)
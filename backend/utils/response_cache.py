@@ -0,0 +1,272 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.cache import caches
+from utils.conditional import is_not_modified, set_validators
+from utils.serialization import negotiate
+
+# Rendered responses of the hot schedule reads. An entry is served as is while
+# fresh, and served stale for a while longer while one background refresh
+# replaces it. Concurrent misses on the same key share a single load, so a
+# burst of N identical requests costs one set of queries.
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: dict = field(default_factory=dict)
+    # MessagePack and compressed encodings of body, filled in as clients ask for them.
+    variants: dict = field(default_factory=dict, compare=False, repr=False)
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResponseCache:
+    def __init__(self, name: str, maxsize: int = 512, ttl: float = 5.0, stale_ttl: float = 30.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # key -> (value, fresh_until, stale_until)
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: dict = {}
+        self._async_flights: dict = {}
+        # Running background refreshes; the loop only keeps weak references to tasks.
+        self._refresh_tasks: set = set()
+        self._refreshing: set = set()
+        # Bumped by every invalidation; a load that started before one is not stored.
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.invalidations = 0
+        caches[name] = self
+
+    def _lookup(self, key):
+        """Returns (value, needs_refresh) for a fresh or stale entry, or None. Holds the lock."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        value, fresh_until, stale_until = entry
+        now = time.monotonic()
+        if now < fresh_until:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value, False
+        if now < stale_until:
+            self.stale_hits += 1
+            needs_refresh = key not in self._refreshing
+            self._refreshing.add(key)
+            return value, needs_refresh
+
+        del self._data[key]
+        return None
+
+    def _store(self, key, value, generation: int):
+        with self._lock:
+            self._refreshing.discard(key)
+            if generation != self._generation:
+                return
+
+            now = time.monotonic()
+            self._data[key] = (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _refresh(self, key, loader, generation: int):
+        try:
+            self._store(key, loader(), generation)
+        except Exception:
+            with self._lock:
+                self._refreshing.discard(key)
+        with self._lock:
+            self.refreshes += 1
+
+    def get(self, key, loader):
+        """Cached value of key, calling loader() at most once per key at a time."""
+        with self._lock:
+            found = self._lookup(key)
+            generation = self._generation
+            if found:
+                value, needs_refresh = found
+                if needs_refresh:
+                    threading.Thread(target=self._refresh, args=(key, loader, generation), daemon=True).start()
+                return value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self._store(key, flight.value, generation)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def aget(self, key, loader):
+        """get() for async handlers; loader is a coroutine function."""
+        with self._lock:
+            found = self._lookup(key)
+            generation = self._generation
+            if found:
+                value, needs_refresh = found
+                if needs_refresh:
+                    task = asyncio.create_task(self._arefresh(key, loader, generation))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return value
+
+            future = self._async_flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._async_flights[key] = asyncio.get_running_loop().create_future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled (its client went away), not this
+                # request: load again, most likely as the new leader.
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.aget(key, loader)
+                raise
+
+        try:
+            value = await loader()
+            self._store(key, value, generation)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an unawaited future does not log a warning.
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                del self._async_flights[key]
+            # Cancelled leader: release the followers instead of leaving them waiting.
+            if not future.done():
+                future.cancel()
+
+    async def _arefresh(self, key, loader, generation: int):
+        try:
+            self._store(key, await loader(), generation)
+        except Exception:
+            with self._lock:
+                self._refreshing.discard(key)
+        except asyncio.CancelledError:
+            # Cancelled at shutdown; let a later stale hit start a new refresh.
+            with self._lock:
+                self._refreshing.discard(key)
+            raise
+        with self._lock:
+            self.refreshes += 1
+
+    def invalidate_where(self, predicate):
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+                self.invalidations += 1
+
+    def clear(self):
+        self.invalidate_where(lambda key: True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+def cache_entry(response: Response, body: bytes) -> CachedResponse:
+    """Freezes the headers set on a scratch Response (validators, cursor) with the body."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return CachedResponse(body=body, etag=headers["etag"], headers=headers)
+
+def respond(request: Request, cached: CachedResponse) -> Response:
+    if is_not_modified(request, cached.etag):
+        return Response(status_code=304, headers={**cached.headers, "Vary": "Accept, Accept-Encoding"})
+    return negotiate(request, cached.body, cached.headers, cached.variants)
+
+def revalidate(request: Request, etag: str, last_modified: datetime | None, cache: str) -> Response | None:
+    """The 304 that respond() would give for a page with these validators, or
+    None when the client's copy is out of date and the page has to be loaded."""
+    if not is_not_modified(request, etag):
+        return None
+    scratch = Response()
+    set_validators(scratch, etag, last_modified, cache)
+    headers = {k: v for k, v in scratch.headers.items() if k != "content-length"}
+    return Response(status_code=304, headers={**headers, "Vary": "Accept, Accept-Encoding"})
+
+# Keys are ("classes", start_date, end_date, cursor, limit) and ("roster", date).
+schedule_cache = ResponseCache(
+    "schedule_responses",
+    maxsize=int(os.getenv("SCHEDULE_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("SCHEDULE_CACHE_TTL", "5")),
+    stale_ttl=float(os.getenv("SCHEDULE_CACHE_STALE_TTL", "30"))
+)
+
+def _covers(key, dates: set[date]) -> bool:
+    if key[0] == "classes":
+        return any(key[1] <= d <= key[2] for d in dates)
+    return key[1] in dates
+
+# bump_date_versions records the dates a transaction changed in Session.info;
+# this worker's cached responses for them are dropped once it commits. Other
+# workers catch up when their entries expire.
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_dates(session):
+    dates = session.info.pop("changed_dates", None)
+    if dates:
+        schedule_cache.invalidate_where(lambda key: _covers(key, dates))
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_dates(session):
+    session.info.pop("changed_dates", None)
@@ -0,0 +1,112 @@
+from datetime import date, time, timedelta
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import Date, DateTime, and_, cast, extract, func, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db.models.class_ import Class
+from db.models.template_class import TemplateClass
+from utils.pagination import decode_cursor
+from utils.versions import bump_date_versions
+
+def decode_schedule_cursor(cursor: str | None) -> tuple[date, time, UUID] | None:
+    if not cursor:
+        return None
+
+    cursor_date, cursor_time, cursor_id = decode_cursor(cursor, 3)
+    try:
+        return date.fromisoformat(cursor_date), time.fromisoformat(cursor_time), UUID(cursor_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Μη έγκυρος δείκτης σελίδας.")
+
+def schedule_cursor_key(class_obj: Class) -> tuple:
+    return class_obj.date, class_obj.time, class_obj.id
+
+def get_schedule_window(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    after: tuple[date, time, UUID] | None = None,
+    limit: int = 500
+) -> list[Class]:
+    """Classes between start_date and end_date ordered by (date, time, id).
+
+    Returns up to limit + 1 rows so callers can tell whether another page
+    exists. Participant counts come from the maintained counter column, so
+    bookings and users are never loaded.
+    """
+    query = (
+        db.query(Class)
+        .filter(Class.date >= start_date, Class.date <= end_date)
+    )
+    if after:
+        query = query.filter(tuple_(Class.date, Class.time, Class.id) > after)
+
+    return (
+        query
+        .order_by(Class.date, Class.time, Class.id)
+        .limit(limit + 1)
+        .all()
+    )
+
+# Key of the transaction-level advisory lock that serializes schedule generation.
+SCHEDULE_GENERATION_LOCK = 7_200_001
+
+def generate_classes(db: Session, start_date: date, end_date: date) -> tuple[int, int]:
+    """Creates the classes of every active template between two dates.
+
+    One INSERT ... SELECT over generate_series does the whole range; classes
+    that already exist are skipped by ON CONFLICT on (date, time, class_name).
+    Concurrent runs queue on an advisory lock instead of racing. Returns the
+    created and skipped counts; the caller commits, which releases the lock.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(SCHEDULE_GENERATION_LOCK)))
+
+    templates_per_weekday = dict(
+        db.query(TemplateClass.weekday, func.count(TemplateClass.id))
+        .filter(TemplateClass.is_active == True)
+        .group_by(TemplateClass.weekday)
+        .all()
+    )
+    days = (end_date - start_date).days + 1
+    candidates = sum(
+        templates_per_weekday.get((start_date + timedelta(days=i)).weekday(), 0)
+        for i in range(days)
+    )
+    if not candidates:
+        return 0, 0
+
+    day = (
+        func.generate_series(
+            cast(start_date, DateTime), cast(end_date, DateTime), literal_column("interval '1 day'")
+        )
+        .table_valued("value")
+        .render_derived(name="days")
+    )
+    rows = (
+        select(
+            func.gen_random_uuid(),
+            TemplateClass.class_name,
+            cast(day.c.value, Date),
+            TemplateClass.time,
+            literal(0),
+            TemplateClass.max_participants
+        )
+        .select_from(day)
+        .join(TemplateClass, and_(
+            TemplateClass.is_active == True,
+            TemplateClass.weekday == extract("isodow", day.c.value) - 1
+        ))
+    )
+
+    classes = Class.__table__
+    created = db.execute(
+        insert(classes)
+        .from_select(["id", "class_name", "date", "time", "current_participants", "max_participants"], rows)
+        .on_conflict_do_nothing(index_elements=["date", "time", "class_name"])
+        .returning(classes.c.date)
+    ).scalars().all()
+    bump_date_versions(db, *created)
+
+    return len(created), candidates - len(created)
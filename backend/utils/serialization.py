@@ -0,0 +1,104 @@
+import gzip
+import json
+import os
+from functools import lru_cache
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+# The fast path for large list responses: a prebuilt TypeAdapter validates the
+# ORM rows and serializes them to JSON bytes in one pass, skipping FastAPI's
+# response_model validation and jsonable_encoder. The client may ask for
+# MessagePack through Accept, and big bodies are compressed when
+# Accept-Encoding allows it. orjson, msgpack and brotli are optional; without
+# them responses fall back to stdlib JSON, JSON and gzip respectively.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Bodies smaller than this are sent uncompressed; the framing costs more than it saves.
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "4096"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Used by main.py for every other endpoint; renders the response_model output with orjson.
+DefaultResponse = ORJSONResponse if orjson else JSONResponse
+
+_loads = orjson.loads if orjson else json.loads
+
+@lru_cache(maxsize=None)
+def type_adapter(tp) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+def dump_json(tp, items, exclude_unset: bool = False) -> bytes:
+    """Validates items (ORM objects or dicts) as tp and serializes them to JSON bytes."""
+    adapter = type_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True), exclude_unset=exclude_unset)
+
+def wants_msgpack(request: Request) -> bool:
+    if msgpack is None:
+        return False
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+def accepted_encoding(request: Request) -> str | None:
+    accepted = [part.split(";")[0].strip() for part in request.headers.get("accept-encoding", "").split(",")]
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def encode_body(json_body: bytes, msgpack_body: bool, encoding: str | None) -> tuple[bytes, str | None]:
+    """The wire bytes of a JSON body in the negotiated format, and the Content-Encoding used."""
+    body = msgpack.packb(_loads(json_body)) if msgpack_body else json_body
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+
+def negotiate(request: Request, json_body: bytes, headers: dict | None = None, variants: dict | None = None) -> Response:
+    """A Response carrying json_body as the client asked for it.
+
+    variants, when given, memoizes the encoded bodies so a cached response is
+    packed and compressed once per format rather than once per request.
+    """
+    msgpack_body = wants_msgpack(request)
+    encoding = accepted_encoding(request)
+
+    key = (msgpack_body, encoding)
+    encoded = variants.get(key) if variants is not None else None
+    if encoded is None:
+        encoded = encode_body(json_body, msgpack_body, encoding)
+        if variants is not None:
+            variants[key] = encoded
+    body, content_encoding = encoded
+
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept, Accept-Encoding"
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+
+    media_type = MSGPACK_MEDIA_TYPES[0] if msgpack_body else JSON_MEDIA_TYPE
+    return Response(content=body, media_type=media_type, headers=headers)
+
+def fast_response(request: Request, tp, items, response: Response | None = None, exclude_unset: bool = False) -> Response:
+    """Serializes items as tp through the fast path, keeping the headers already set on response."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"} if response else None
+    return negotiate(request, dump_json(tp, items, exclude_unset=exclude_unset), headers)
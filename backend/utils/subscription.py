@@ -1,24 +1,38 @@
-from datetime import datetime, timedelta
+from uuid import UUID
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
-from db.models import booking, class_, user
-from db.models.subscription import SubscriptionModel, Subscription
-from utils.calc_class import calculate_remaining_classes
-
-def validate_booking_rules(db: Session, current_user: user.User, class_obj: class_.Class):
+from db.models import class_, user
+from db.models.subscription import SubscriptionModel
+from utils.calc_class import debit_credit, find_package_credit, is_package
+from utils.entitlements import get_entitlements
+from utils.member_tokens import MemberIdentity
+
+def lock_user_bookings(db: Session, user_id: UUID) -> int | None:
+    """Serializes the booking attempts of one member.
+
+    Takes a row lock on the user that is held until the transaction ends, so
+    the count-then-insert checks of two parallel requests (double tap, client
+    retry) cannot interleave. Bookings of other members are not blocked.
+    Returns the member's entitlements version.
+    """
+    return db.scalar(select(user.User.version).where(user.User.id == user_id).with_for_update())
+
+def validate_booking_rules(db: Session, current_user: MemberIdentity, class_obj: class_.Class, version: int | None = None):
+    """Must run after lock_user_bookings, in the transaction that inserts the booking.
+
+    Subscriptions and booking counts come from the member's entitlement
+    snapshot. When the class is paid from a package, one credit is debited and
+    the package subscription is returned so the booking can record it.
+    """
     user_id = current_user.id
     class_name = class_obj.class_name.lower()
     is_cadillac_class = "cadillac" in class_name
+    entitlements = get_entitlements(db, user_id, version=version)
 
     # Check for weekly subscriptions
-    active_subs = (
-        db.query(Subscription)
-        .filter(Subscription.user_id == user_id)
-        .filter(Subscription.start_date <= class_obj.date, Subscription.end_date >= class_obj.date)
-        .order_by(Subscription.start_date.desc())
-        .all()
-    )
+    active_subs = entitlements.subscriptions_covering(class_obj.date) if entitlements else []
 
     if not active_subs:
         raise HTTPException(status_code=400, detail="Δεν έχετε ενεργή συνδρομή.")
@@ -46,16 +60,7 @@ def validate_booking_rules(db: Session, current_user: user.User, class_obj: clas
     sub_model = matching_sub.subscription_model
 
     # One booking per day
-    same_day_bookings = (
-        db.query(booking.Booking)
-        .join(class_.Class)
-        .filter(
-            booking.Booking.user_id == user_id,
-            class_.Class.date == class_obj.date
-        )
-        .count()
-    )
-    if same_day_bookings >= 1:
+    if entitlements.bookings_on(class_obj.date) >= 1:
         raise HTTPException(status_code=400, detail="Μπορείτε να κάνετε μόνο 1 κράτηση ανά ημέρα.")
 
     # Weekly subscriptions rules
@@ -66,19 +71,7 @@ def validate_booking_rules(db: Session, current_user: user.User, class_obj: clas
         SubscriptionModel.family_2,
         SubscriptionModel.family_3,
     ]:
-        start_of_week = class_obj.date - timedelta(days=class_obj.date.weekday())
-        end_of_week = start_of_week + timedelta(days=6)
-
-        weekly_bookings = (
-            db.query(booking.Booking)
-            .join(class_.Class)
-            .filter(
-                booking.Booking.user_id == user_id,
-                class_.Class.date >= start_of_week,
-                class_.Class.date <= end_of_week
-            )
-            .count()
-        )
+        weekly_bookings = entitlements.bookings_in_week(class_obj.date)
 
         allowed = {
             SubscriptionModel.subscription_2: 2,
@@ -91,60 +84,22 @@ def validate_booking_rules(db: Session, current_user: user.User, class_obj: clas
         if weekly_bookings >= allowed:
             raise HTTPException(status_code=400, detail=f"Η συνδρομή σας, σας επιτρέπει έως {allowed} κρατήσεις την εβδομάδα.")
 
-    if "package" in sub_model.name.lower():
-        eligible = find_eligible_subscription_for_class(current_user, class_obj, db)
-        if not eligible:
+    if is_package(sub_model):
+        paid_by = debit_credit(db, user_id, class_obj)
+        if not paid_by:
             raise HTTPException(status_code=400, detail="Δεν έχετε ενεργό πακέτο με διαθέσιμα μαθήματα.")
+        return paid_by
+
+    return None
 
 
 def find_eligible_subscription_for_class(user: user.User, class_obj: class_.Class, db: Session) -> dict | None:
     """Returns the first matching active subscription with available classes for a specific class_obj"""
-    eligible_subs = []
-
-    for sub in user.subscriptions:
-        model = sub.subscription_model.name.lower()
-
-        # Skip if not a package subscription
-        if "package" not in model:
-            continue
-
-        # Check subscription date validity
-        if not (sub.start_date.date() <= class_obj.date <= sub.end_date.date()):
-            continue
-
-        # Cadillac logic
-        if "cadillac" in model and "cadillac" not in class_obj.class_name.lower():
-            continue
-        if "cadillac" not in model and "cadillac" in class_obj.class_name.lower():
-            continue
-
-        # Define class filter
-        class_filter = (
-            class_.Class.class_name.ilike("%cadillac%")
-            if "cadillac" in model
-            else ~class_.Class.class_name.ilike("%cadillac%")
-        )
-
-        # Count bookings within subscription date and class type
-        booking_count = (
-            db.query(booking.Booking)
-            .join(class_.Class)
-            .filter(
-                booking.Booking.user_id == user.id,
-                booking.Booking.status == "confirmed",
-                class_.Class.date >= sub.start_date,
-                class_.Class.date <= sub.end_date,
-                class_filter
-            )
-            .count()
-        )
-
-        remaining = max(0, sub.package_total - booking_count)
-
-        if remaining > 0:
-            eligible_subs.append({
-                "subscription": sub,
-                "remaining": remaining
-            })
-
-    return eligible_subs[0] if eligible_subs else None
+    sub = find_package_credit(db, user.id, class_obj)
+    if not sub:
+        return None
+
+    return {
+        "subscription": sub,
+        "remaining": sub.remaining_classes
+    }
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from uuid import UUID
+from sqlalchemy import distinct, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db.models.booking import Booking
+from db.models.class_ import Class
+from db.models.schedule_version import ScheduleVersion
+from db.models.user import User
+
+# Change counters behind the ETags of the schedule, day roster and profile
+# reads. A date's counter is bumped in the same transaction as any change to
+# its classes or bookings, a member's in the same transaction as any change
+# to their bookings or subscriptions (see bump_user_version).
+
+def bump_date_versions(db: Session, *dates: date) -> None:
+    """Marks the given class dates changed; call it last in the writing transaction.
+
+    The upsert holds the date's row lock until commit, so it goes after the
+    user, class and subscription locks, with dates in a fixed order.
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return
+
+    # Picked up after commit to drop this worker's cached responses (utils.response_cache).
+    db.info.setdefault("changed_dates", set()).update(dates)
+
+    stmt = insert(ScheduleVersion).values([{"date": d, "version": 1} for d in dates])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[ScheduleVersion.date],
+        set_={"version": ScheduleVersion.version + 1, "updated_at": func.now()}
+    ))
+
+def booked_dates(db: Session, user_id: UUID, since: date | None = None) -> list[date]:
+    """The class dates a member has bookings on."""
+    stmt = (
+        select(distinct(Class.date))
+        .join(Booking, Booking.class_id == Class.id)
+        .where(Booking.user_id == user_id)
+    )
+    if since:
+        stmt = stmt.where(Class.date >= since)
+    return list(db.scalars(stmt))
+
+def schedule_version(db: Session, start_date: date, end_date: date) -> tuple[tuple, datetime | None]:
+    """A fingerprint of every change between two dates and when the last one happened."""
+    row = db.execute(
+        select(
+            func.count(ScheduleVersion.date),
+            func.coalesce(func.sum(ScheduleVersion.version), 0),
+            func.max(ScheduleVersion.updated_at)
+        )
+        .where(ScheduleVersion.date.between(start_date, end_date))
+    ).one()
+    return (row[0], row[1]), row[2]
+
+def profile_version(db: Session, user_id: UUID, today: date) -> tuple | None:
+    """A fingerprint of a member's profile: their own counter plus every upcoming
+    date, whose participant counts the embedded bookings show. None if the
+    member does not exist."""
+    user_version = db.scalar(select(User.version).where(User.id == user_id))
+    if user_version is None:
+        return None
+
+    upcoming, _ = schedule_version(db, today, date.max)
+    return (user_version, *upcoming)
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import os
+import time
+from typing import List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from db import database
+from db.schemas.booking import AdminBookingOut, BookingOut
+from db.schemas.class_ import ClassOut, ClassPublicOut
+from db.schemas.user import UserListOut
+from utils.serialization import dump_json
+
+# Optional work done in the lifespan hook before the instance reports ready,
+# so the first requests after a deploy do not pay for it. Both are off by
+# default; a cold start then only costs the imports.
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "0"))
+WARMUP_SCHEMAS = os.getenv("WARMUP_SCHEMAS", "false").lower() == "true"
+# A failed warmup (say the database is briefly unreachable) leaves the
+# instance running but not ready, and is retried this often until it passes.
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+
+logger = logging.getLogger(__name__)
+
+# The list types behind the large responses (see utils.serialization).
+WARM_TYPES = [
+    List[ClassPublicOut],
+    List[ClassOut],
+    List[AdminBookingOut],
+    List[BookingOut],
+    List[UserListOut],
+]
+
+def warm_schemas() -> None:
+    """Configures the ORM mappers and builds the serialization TypeAdapters."""
+    configure_mappers()
+    for tp in WARM_TYPES:
+        dump_json(tp, [])
+
+def warm_pool(connections: int) -> None:
+    """Opens up to `connections` pooled connections at once and returns them to the pool."""
+    engine = database.get_engine()
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+
+async def warm_async_pool(connections: int) -> None:
+    engine = database.get_async_engine()
+    count = min(connections, engine.pool.size())
+    # Every connection is held until all are open, otherwise each task would
+    # reuse the first one. A failure releases the others.
+    hold = asyncio.Event()
+    opened = 0
+
+    async def touch():
+        nonlocal opened
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                opened += 1
+                if opened == count:
+                    hold.set()
+                await hold.wait()
+        finally:
+            hold.set()
+
+    await asyncio.gather(*(touch() for _ in range(count)))
+
+async def warm_up() -> dict:
+    """Runs the configured warmup steps and reports how long each took, in ms.
+
+    A failing step is reported under "error" instead of raising, so startup
+    goes on and /readyz answers 503 until a retry passes.
+    """
+    timings = {}
+    try:
+        if WARMUP_SCHEMAS:
+            started = time.perf_counter()
+            await run_in_threadpool(warm_schemas)
+            timings["schemas_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        # Behind PgBouncer the engines keep no connections to warm.
+        if WARMUP_POOL_CONNECTIONS and not database.DB_PGBOUNCER:
+            started = time.perf_counter()
+            await run_in_threadpool(warm_pool, WARMUP_POOL_CONNECTIONS)
+            if database.DB_ASYNC:
+                await warm_async_pool(WARMUP_POOL_CONNECTIONS)
+            timings["pool_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    except Exception as e:
+        logger.warning("Warmup failed, retrying in %s s: %s", WARMUP_RETRY_SECONDS, e)
+        timings["error"] = f"{type(e).__name__}: {e}"
+
+    return timings
+
+async def retry_warm_up(state) -> None:
+    """Repeats warm_up() until it passes; state.warmup holds the latest result."""
+    while "error" in state.warmup:
+        await asyncio.sleep(WARMUP_RETRY_SECONDS)
+        state.warmup = await warm_up()
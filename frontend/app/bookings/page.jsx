@@ -64,17 +64,23 @@ export default function BookingsPage() {
 
         setUser(storedUser);
 
-        // Fetch user data with bookings
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/users/${storedUser.id}`);
+        // Fetch user data with upcoming bookings, plus the latest page of past ones
+        const [response, historyResponse] = await Promise.all([
+          fetch(`${process.env.NEXT_PUBLIC_API_URL}/users/${storedUser.id}`),
+          fetch(`${process.env.NEXT_PUBLIC_API_URL}/users/${storedUser.id}/bookings/history`, {
+            headers: { Authorization: `Bearer ${storedUser.token}` }
+          })
+        ]);
         
         if (!response.ok) {
           throw new Error(t('failed_fetch_user_data'));
         }
 
         const userData = await response.json();
+        const history = historyResponse.ok ? await historyResponse.json() : [];
         
         // Transform bookings data to match the expected format
-        let transformedBookings = userData.bookings?.map(booking => {
+        let transformedBookings = [...(userData.bookings || []), ...history].map(booking => {
           const [fromRaw, toRaw] = booking.class_.time.split('-').map(s => s.trim());
           return {
             id: booking.id,
@@ -127,10 +133,11 @@ export default function BookingsPage() {
         return;
       }
 
-      const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/bookings/${bookingId}?user_id=${storedUser.id}`, {
+      const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/bookings/${bookingId}`, {
         method: 'DELETE',
         headers: {
           'Content-Type': 'application/json',
+          Authorization: `Bearer ${storedUser.token}`,
         },
       });
 
@@ -41,6 +41,26 @@ function getDatesInRange(start, end) {
   return dates;
 }
 
+// /classes serves a window of at most 62 days, one page per X-Next-Cursor;
+// the page loads the month the calendar shows, following every page.
+async function fetchClassesForMonth(month) {
+  // month is 'YYYY-MM'
+  const [year, monthIndex] = month.split('-').map(Number);
+  const start = new Date(year, monthIndex - 1, 1);
+  const days = new Date(year, monthIndex, 0).getDate();
+  const classes = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ start_date: formatDate(start), days: String(days) });
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/classes?${params}`);
+    if (!res.ok) throw new Error(`GET /classes: ${res.status}`);
+    classes.push(...(await res.json()));
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return classes;
+}
+
 export default function ProgramsPage() {
   const { t, i18n } = useTranslation();
   const calendarLocale = i18n.language === 'gr' ? 'el-GR' : 'en-US';
@@ -53,22 +73,27 @@ export default function ProgramsPage() {
   const [bookingLoading, setBookingLoading] = useState(false);
   const [userBookings, setUserBookings] = useState([]);
   const [programsLoading, setProgramsLoading] = useState(true);
+  const [activeMonth, setActiveMonth] = useState(() => formatDate(new Date()).slice(0, 7));
 
   useEffect(() => {
+    let cancelled = false;
     setProgramsLoading(true);
-    fetch(`${process.env.NEXT_PUBLIC_API_URL}/classes`)
-      .then(res => res.json())
+    fetchClassesForMonth(activeMonth)
       .then(data => {
+        if (cancelled) return;
         const grouped = {};
         data.forEach(prog => {
           const key = prog.date;
           if (!grouped[key]) grouped[key] = [];
           grouped[key].push(prog);
         });
-        setProgramsByDate(grouped);
+        setProgramsByDate(prev => ({ ...prev, ...grouped }));
       })
-      .finally(() => setProgramsLoading(false));
-  }, []);
+      .finally(() => {
+        if (!cancelled) setProgramsLoading(false);
+      });
+    return () => { cancelled = true; };
+  }, [activeMonth]);
   useEffect(() => {
     // Fetch user bookings if logged in
     const user = JSON.parse(localStorage.getItem('user') || '{}');
@@ -133,9 +158,12 @@ const handleBookProgram = async (program) => {
       status: 'confirmed'
     };
 
-    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/bookings?user_id=${user.id}`, {
+    const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/bookings`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${user.token}`
+      },
       body: JSON.stringify(bookingData)
     });
 
@@ -213,6 +241,9 @@ const handleBookProgram = async (program) => {
               setSelectedDate(date);
             }}
             onClickDay={handleDayClick}
+            onActiveStartDateChange={({ activeStartDate, view }) => {
+              if (view === 'month' && activeStartDate) setActiveMonth(formatDate(activeStartDate).slice(0, 7));
+            }}
             tileClassName={({ date, view }) => {
               const key = formatDate(date);
               if (view === 'month' && programsByDate[key]) {